@@ -1,20 +1,38 @@
-from .core.assistant_manager import AssistantManager
-from .core.thread_manager import ThreadManager
-from .core.run_manager import RunManager
-from .models.tool import Tool
-from .utils.logging_utils import set_logging
-from typing import List, Type
+from typing import TYPE_CHECKING, Dict, List
+from .utils.lazy import lazy_exports
 
 try:
     from ._version import __version__
 except ImportError:
     __version__ = "0.0.0"
 
+if TYPE_CHECKING:
+    from .core.assistant_manager import AssistantManager
+    from .core.thread_manager import ThreadManager
+    from .core.run_manager import RunManager
+    from .core.sharded_run_manager import ShardedRunManager
+    from .models.tool import Tool
+    from .utils.logging_utils import set_logging
+
+# Public names are imported on first access so that `import assinstants`
+# stays cheap; pydantic models and the managers load only when used.
+_LAZY_IMPORTS: Dict[str, str] = {
+    "AssistantManager": ".core.assistant_manager",
+    "ThreadManager": ".core.thread_manager",
+    "RunManager": ".core.run_manager",
+    "ShardedRunManager": ".core.sharded_run_manager",
+    "Tool": ".models.tool",
+    "set_logging": ".utils.logging_utils",
+}
+
 __all__: List[str] = [
     "AssistantManager",
     "ThreadManager",
     "RunManager",
+    "ShardedRunManager",
     "Tool",
     "set_logging",
     "__version__",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS, __all__)
@@ -1,7 +1,48 @@
 # core/init.py
-from .assistant_manager import AssistantManager
-from .thread_manager import ThreadManager
-from .run_manager import RunManager
-from typing import List
+from typing import TYPE_CHECKING, Dict, List
+from ..utils.lazy import lazy_exports
 
-__all__: List[str] = ["AssistantManager", "ThreadManager", "RunManager"]
+if TYPE_CHECKING:
+    from .assistant_manager import AssistantManager
+    from .thread_manager import ThreadManager
+    from .run_manager import RunManager
+    from .sharded_run_manager import ShardedRunManager
+    from .event_bus import EventBus, Subscription
+    from .message_index import MessageIndex
+    from .blob_store import BlobStore
+    from .plan_cache import PlanCache
+    from .snapshot import CallableRegistry, registry, save_snapshot, load_snapshot
+
+_LAZY_IMPORTS: Dict[str, str] = {
+    "AssistantManager": ".assistant_manager",
+    "ThreadManager": ".thread_manager",
+    "RunManager": ".run_manager",
+    "ShardedRunManager": ".sharded_run_manager",
+    "EventBus": ".event_bus",
+    "Subscription": ".event_bus",
+    "MessageIndex": ".message_index",
+    "BlobStore": ".blob_store",
+    "PlanCache": ".plan_cache",
+    "CallableRegistry": ".snapshot",
+    "registry": ".snapshot",
+    "save_snapshot": ".snapshot",
+    "load_snapshot": ".snapshot",
+}
+
+__all__: List[str] = [
+    "AssistantManager",
+    "ThreadManager",
+    "RunManager",
+    "ShardedRunManager",
+    "EventBus",
+    "Subscription",
+    "MessageIndex",
+    "BlobStore",
+    "PlanCache",
+    "CallableRegistry",
+    "registry",
+    "save_snapshot",
+    "load_snapshot",
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS, __all__)
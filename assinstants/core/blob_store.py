@@ -0,0 +1,121 @@
+# core/blob_store.py
+import hashlib
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, Optional
+from ..utils.exceptions import StorageError
+from ..utils.logging_utils import log
+
+# Key that marks a dict as a reference to a stored blob rather than a value.
+BLOB_REFERENCE = "$blob"
+
+
+def is_blob_reference(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get(BLOB_REFERENCE), str)
+
+
+class BlobStore:
+    """
+    Content-addressed store for large payloads on the local filesystem.
+
+    Blobs are named by the SHA-256 of their content, so storing the same
+    payload twice keeps a single copy. A store without a directory writes to
+    a temporary one that is removed by close() or, failing that, when the
+    store is garbage collected or the interpreter exits.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """
+        Initialize the BlobStore.
+
+        Args:
+            directory (Optional[str]): Where blobs are written. Defaults to a
+                new temporary directory created on first use. A directory
+                given here is never removed.
+        """
+        self._directory = directory
+        self.temporary = directory is None
+        self._temporary: Optional[weakref.finalize] = None
+
+    @property
+    def directory(self) -> str:
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="assinstants-blobs-")
+            self._temporary = weakref.finalize(
+                self, shutil.rmtree, self._directory, ignore_errors=True
+            )
+            log("FUNCTION", f"Blob store created in {self._directory}")
+        return self._directory
+
+    def close(self) -> None:
+        """
+        Remove the temporary directory and every blob in it.
+
+        Stores opened on a given directory keep their blobs. A closed store
+        can be used again; it then writes to a new temporary directory.
+        """
+        if self._temporary is not None:
+            self._temporary()
+            self._temporary = None
+            self._directory = None
+
+    def _path(self, blob_id: str) -> str:
+        if len(blob_id) != 64 or not all(c in "0123456789abcdef" for c in blob_id):
+            raise StorageError(f"Invalid blob id {blob_id!r}")
+        return os.path.join(self.directory, blob_id)
+
+    def put(self, data: bytes) -> str:
+        """
+        Store a payload.
+
+        Args:
+            data (bytes): The payload.
+
+        Returns:
+            str: The blob id.
+
+        Raises:
+            StorageError: If the blob can't be written.
+        """
+        blob_id = hashlib.sha256(data).hexdigest()
+        path = self._path(blob_id)
+        if os.path.exists(path):
+            return blob_id
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as out:
+                out.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            raise StorageError(f"Failed to write blob {blob_id}: {e}")
+        return blob_id
+
+    def get(self, blob_id: str) -> bytes:
+        """
+        Read a payload.
+
+        Args:
+            blob_id (str): The id returned by put.
+
+        Returns:
+            bytes: The payload.
+
+        Raises:
+            StorageError: If the blob does not exist or can't be read.
+        """
+        try:
+            with open(self._path(blob_id), "rb") as source:
+                return source.read()
+        except OSError as e:
+            raise StorageError(f"Failed to read blob {blob_id}: {e}")
+
+    def delete(self, blob_id: str) -> None:
+        try:
+            os.remove(self._path(blob_id))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise StorageError(f"Failed to delete blob {blob_id}: {e}")
@@ -0,0 +1,161 @@
+# core/event_bus.py
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set
+from ..models.event import RunEvent
+
+
+class Subscription:
+    """
+    A bounded stream of run events for one subscriber.
+
+    When the buffer is full the oldest event is dropped and counted in
+    `dropped`, so a slow consumer never makes memory grow without bound.
+    Subscriptions to a single run end after the run's terminal status event.
+    """
+
+    def __init__(
+        self,
+        bus: "EventBus",
+        run_id: Optional[str],
+        thread_id: Optional[str],
+        max_queue: int,
+    ) -> None:
+        self.run_id = run_id
+        self.thread_id = thread_id
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.closed = False
+        self._bus = bus
+        self._buffer: Deque[RunEvent] = deque()
+        self._ready = asyncio.Event()
+
+    def _push(self, event: RunEvent) -> None:
+        if self.closed:
+            return
+        if len(self._buffer) >= self.max_queue:
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append(event)
+        self._ready.set()
+        if self.run_id is not None and event.is_terminal:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop receiving events. Buffered events can still be read.
+        """
+        if not self.closed:
+            self.closed = True
+            self._bus._unsubscribe(self)
+            self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[RunEvent]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait before giving up.
+
+        Returns:
+            Optional[RunEvent]: The next event, or None once the subscription is
+            closed and drained.
+
+        Raises:
+            asyncio.TimeoutError: If no event arrives within the timeout.
+        """
+        while not self._buffer:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        return self._buffer.popleft()
+
+    def __aiter__(self) -> "Subscription":
+        return self
+
+    async def __anext__(self) -> RunEvent:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class EventBus:
+    """
+    Publishes run events to subscribers of a run, a thread or all runs.
+    """
+
+    def __init__(self, max_queue: int = 100) -> None:
+        """
+        Initialize the EventBus.
+
+        Args:
+            max_queue (int): Default buffer size of each subscription.
+        """
+        self.max_queue = max_queue
+        self._by_run: Dict[str, Set[Subscription]] = {}
+        self._by_thread: Dict[str, Set[Subscription]] = {}
+        self._all: Set[Subscription] = set()
+
+    def subscribe(
+        self,
+        run_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        max_queue: Optional[int] = None,
+    ) -> Subscription:
+        """
+        Subscribe to the events of a run, of every run on a thread, or of all
+        runs when neither is given.
+
+        Args:
+            run_id (Optional[str]): The run to follow.
+            thread_id (Optional[str]): The thread to follow.
+            max_queue (Optional[int]): Buffer size for this subscription.
+
+        Returns:
+            Subscription: Await `get()` or iterate with `async for`.
+        """
+        if run_id is not None and thread_id is not None:
+            raise ValueError("Subscribe to either a run or a thread, not both")
+        subscription = Subscription(
+            self, run_id, thread_id, max_queue or self.max_queue
+        )
+        if run_id is not None:
+            self._by_run.setdefault(run_id, set()).add(subscription)
+        elif thread_id is not None:
+            self._by_thread.setdefault(thread_id, set()).add(subscription)
+        else:
+            self._all.add(subscription)
+        return subscription
+
+    def publish(self, event: RunEvent) -> None:
+        """
+        Deliver an event to every matching subscriber without blocking.
+        """
+        for subscription in (
+            *self._by_run.get(event.run_id, ()),
+            *self._by_thread.get(event.thread_id, ()),
+            *self._all,
+        ):
+            subscription._push(event)
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        if subscription.run_id is not None:
+            subscribers = self._by_run.get(subscription.run_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._by_run.pop(subscription.run_id, None)
+        elif subscription.thread_id is not None:
+            subscribers = self._by_thread.get(subscription.thread_id, set())
+            subscribers.discard(subscription)
+            if not subscribers:
+                self._by_thread.pop(subscription.thread_id, None)
+        else:
+            self._all.discard(subscription)
@@ -0,0 +1,128 @@
+# core/message_index.py
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from ..models.message import Message
+
+_TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by do for from has have i in is it its me my "
+    "of on or so that the this to was we what with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token
+        for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+class MessageIndex:
+    """
+    Inverted index over the messages of one thread, ranked with BM25.
+
+    The index follows a thread's message list and only tokenizes messages
+    appended since the last update, so keeping it current costs time
+    proportional to the new text rather than to the whole thread.
+    """
+
+    def __init__(
+        self,
+        messages: List[Message],
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_document_frequency: float = 0.5,
+    ) -> None:
+        """
+        Initialize the MessageIndex.
+
+        Args:
+            messages (List[Message]): The thread's message list. It is read,
+                never modified, and must only grow.
+            k1 (float): BM25 term frequency saturation.
+            b (float): BM25 document length normalization.
+            max_document_frequency (float): Share of messages above which a
+                term is ignored when the query has rarer terms.
+        """
+        self.messages = messages
+        self.k1 = k1
+        self.b = b
+        self.max_document_frequency = max_document_frequency
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._lengths: List[int] = []
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def update(self) -> None:
+        """
+        Index messages appended to the thread since the last update.
+        """
+        for position in range(len(self._lengths), len(self.messages)):
+            terms = Counter(tokenize(self.messages[position].content))
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[position] = count
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._total_length += length
+
+    def search(
+        self, query: str, k: int = 5, before: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Find the messages most relevant to a query.
+
+        Args:
+            query (str): Free text to match.
+            k (int): Maximum number of results.
+            before (Optional[int]): Only consider messages at positions below
+                this one, e.g. to skip those already in the prompt.
+
+        Returns:
+            List[Tuple[int, float]]: (position, score) pairs, best first.
+        """
+        self.update()
+        count = len(self._lengths) if before is None else min(before, len(self._lengths))
+        if k <= 0 or count <= 0:
+            return []
+
+        total = len(self._lengths)
+        average_length = self._total_length / total or 1.0
+        weighted = []
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if postings:
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                weighted.append((idf, postings))
+        # Rarest terms first. Terms found in most of the thread barely move
+        # the ranking but cost the most to scan, so they are dropped unless
+        # nothing rarer matched.
+        weighted.sort(key=lambda item: item[0], reverse=True)
+        weighted = weighted[:1] + [
+            (idf, postings)
+            for idf, postings in weighted[1:]
+            if len(postings) <= total * self.max_document_frequency
+        ]
+        # Once the k-th best score beats the most the remaining terms could
+        # add, messages without a match so far can't make the top k and only
+        # existing candidates need updating.
+        remaining = sum(idf for idf, _ in weighted) * (self.k1 + 1)
+        scores: Dict[int, float] = {}
+        for idf, postings in weighted:
+            pruned = len(scores) >= k and heapq.nlargest(k, scores.values())[-1] >= remaining
+            remaining -= idf * (self.k1 + 1)
+            if pruned and len(scores) < len(postings):
+                matches = [(p, postings[p]) for p in scores if p in postings]
+            else:
+                matches = [(p, f) for p, f in postings.items() if p < count]
+            for position, frequency in matches:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / average_length)
+                scores[position] = scores.get(position, 0.0) + idf * frequency * (
+                    self.k1 + 1
+                ) / (frequency + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,385 @@
+# core/plan_cache.py
+import copy
+import hashlib
+import json
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+from ..models.assistant import Assistant
+from ..models.tool import FunctionTool
+from .message_index import STOPWORDS
+
+_WORD = re.compile(r"\w+")
+_MIX = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+
+
+# Words that flip or switch the meaning of a request. They are kept even
+# when they are stopwords, and queries must agree on them exactly.
+_POLARITY = frozenset(
+    "not no never none nothing nobody nowhere neither nor without on off "
+    "cancel stop undo disable enable unless except".split()
+)
+_NEGATED_CONTRACTIONS = frozenset(
+    "t dont doesnt didnt cant cannot wont isnt arent wasnt werent shouldnt "
+    "couldnt wouldnt havent hasnt".split()
+)
+
+
+def _normalize(query: str) -> str:
+    words = []
+    for word in _WORD.findall(query.lower()):
+        if word in _NEGATED_CONTRACTIONS:
+            # "don't" splits into "don" and "t"; keep the negation.
+            words.append("not")
+        elif word in _POLARITY or (
+            word not in STOPWORDS and (len(word) > 1 or word.isdigit())
+        ):
+            words.append(word)
+    return " ".join(words)
+
+
+def _polarity(normalized: str) -> FrozenSet[str]:
+    return frozenset(word for word in normalized.split() if word in _POLARITY)
+
+
+def _features(normalized: str) -> FrozenSet[str]:
+    padded = f" {normalized} "
+    trigrams = {padded[i : i + 3] for i in range(len(padded) - 2)}
+    return frozenset(trigrams | {f"w:{word}" for word in normalized.split()})
+
+
+def _words(text: str) -> str:
+    return f" {' '.join(_WORD.findall(text.lower()))} "
+
+
+def _argument_values(value: Any) -> List[str]:
+    if isinstance(value, bool) or value is None:
+        return []
+    if isinstance(value, (str, int, float)):
+        return [str(value)]
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [leaf for item in value for leaf in _argument_values(item)]
+    return []
+
+
+def assistants_fingerprint(assistants: List[Assistant]) -> str:
+    """
+    Identify an assistant set by everything the planner sees of it.
+    """
+    description = [
+        [
+            assistant.id,
+            assistant.name,
+            assistant.instructions,
+            [
+                [tool.tool.function.name, tool.tool.function.json_schema()]
+                for tool in assistant.tools
+                if isinstance(tool.tool, FunctionTool)
+            ],
+        ]
+        for assistant in assistants
+    ]
+    return hashlib.sha1(
+        json.dumps(description, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class _CacheEntry:
+    def __init__(
+        self,
+        fingerprint: str,
+        normalized: str,
+        features: FrozenSet[str],
+        bands: List[Tuple[int, ...]],
+        words: str,
+        plan: Dict[str, Any],
+    ) -> None:
+        self.polarity = _polarity(normalized)
+        self.fingerprint = fingerprint
+        self.normalized = normalized
+        self.features = features
+        self.bands = bands
+        self.words = words
+        self.plan = plan
+        self.created_at = time.monotonic()
+        self.hits = 0
+
+
+class PlanCache:
+    """
+    Approximate cache of planner decisions for near-duplicate queries.
+
+    Queries are normalized (case, punctuation and stopwords removed) and
+    compared by the Jaccard similarity of their character trigrams and words.
+    MinHash signatures split into LSH bands find candidates without comparing
+    against every entry. A cached plan is only reused for the same assistant
+    set and the same last history_messages of conversation, only if both
+    queries use the same negation and polarity words ("not", "off",
+    "cancel", ...), and only if every argument value it took from the
+    original query (e.g. a city name) also appears in the new one.
+
+    With history_messages=0 plans are shared across conversations. That is
+    unsafe for queries whose meaning depends on context ("do that again",
+    "yes, go ahead"): they can reuse a plan made for a different conversation.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        max_entries: int = 1024,
+        ttl: Optional[float] = None,
+        min_words: int = 2,
+        history_messages: int = 2,
+        num_perm: int = 32,
+        bands: int = 8,
+        verify_fraction: float = 0.0,
+        seed: int = 1,
+    ) -> None:
+        """
+        Initialize the PlanCache.
+
+        Args:
+            threshold (float): Minimum Jaccard similarity for a hit.
+            max_entries (int): Entries kept before the least recently used
+                one is evicted.
+            ttl (Optional[float]): Seconds an entry stays valid.
+            min_words (int): Queries with fewer normalized words are not
+                cached; short follow-ups depend too much on context.
+            history_messages (int): Number of preceding messages that must
+                also match for a plan to be reused.
+            num_perm (int): MinHash signature length.
+            bands (int): LSH bands; num_perm must be divisible by it.
+            verify_fraction (float): Share of hits the RunManager re-plans in
+                the background to measure accuracy.
+            seed (int): Seed for feature hashing and verification sampling.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.min_words = min_words
+        self.history_messages = history_messages
+        self.num_perm = num_perm
+        self.bands = bands
+        self.verify_fraction = verify_fraction
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._entries: "OrderedDict[int, _CacheEntry]" = OrderedDict()
+        self._exact: Dict[Tuple[str, str], int] = {}
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[int]] = {}
+        self._next_id = 0
+        self.lookups = 0
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.verifications = 0
+        self.verified_matches = 0
+
+    def _signature_bands(self, features: FrozenSet[str]) -> List[Tuple[int, ...]]:
+        # One-permutation MinHash: each feature is hashed once into one of
+        # num_perm bins, keeping the minimum per bin. Empty bins borrow the
+        # next filled bin's value so similar sets still agree on them.
+        size = self.num_perm
+        bins = [-1] * size
+        for feature in features:
+            h = (zlib.crc32(feature.encode("utf-8"), self.seed) * _MIX) & _MASK
+            slot, value = h % size, h // size
+            if bins[slot] < 0 or value < bins[slot]:
+                bins[slot] = value
+        signature = bins[:]
+        if features:
+            for i in range(size):
+                distance = 1
+                while signature[i] < 0:
+                    source = bins[(i + distance) % size]
+                    if source >= 0:
+                        signature[i] = source + distance * _MASK
+                    distance += 1
+        rows = size // self.bands
+        return [tuple(signature[i : i + rows]) for i in range(0, size, rows)]
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id)
+        self._exact.pop((entry.fingerprint, entry.normalized), None)
+        for index, band in enumerate(entry.bands):
+            key = (entry.fingerprint, index, band)
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _expired(self, entry: _CacheEntry) -> bool:
+        return self.ttl is not None and time.monotonic() - entry.created_at > self.ttl
+
+    def _arguments_match(self, entry: _CacheEntry, words: str) -> bool:
+        for step in entry.plan["steps"]:
+            for call in step.get("function_calls") or []:
+                for value in _argument_values(call.get("arguments")):
+                    value_words = _words(value)
+                    if value_words.strip() and value_words in entry.words and value_words not in words:
+                        return False
+        return True
+
+    def _scope(self, assistants: List[Assistant], history: Sequence[str]) -> str:
+        scope = assistants_fingerprint(assistants)
+        recent = list(history)[-self.history_messages :] if self.history_messages else []
+        if recent:
+            scope += hashlib.sha1(
+                json.dumps(recent).encode("utf-8")
+            ).hexdigest()
+        return scope
+
+    def lookup(
+        self, query: str, assistants: List[Assistant], history: Sequence[str] = ()
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached plan for a query similar enough to this one.
+
+        Args:
+            query (str): The user query.
+            assistants (List[Assistant]): The assistants the run can use.
+            history (Sequence[str]): Contents of the messages before the
+                query, oldest first.
+
+        Returns:
+            Optional[Dict[str, Any]]: A copy of the cached plan, or None.
+        """
+        self.lookups += 1
+        normalized = _normalize(query)
+        if len(normalized.split()) < self.min_words:
+            self.misses += 1
+            return None
+        fingerprint = self._scope(assistants, history)
+        polarity = _polarity(normalized)
+        words = _words(query)
+
+        candidates: List[Tuple[float, int]] = []
+        exact_id = self._exact.get((fingerprint, normalized))
+        if exact_id is not None:
+            candidates.append((1.0, exact_id))
+        else:
+            features = _features(normalized)
+            seen: Set[int] = set()
+            for index, band in enumerate(self._signature_bands(features)):
+                for entry_id in self._buckets.get((fingerprint, index, band), ()):
+                    if entry_id in seen:
+                        continue
+                    seen.add(entry_id)
+                    other = self._entries[entry_id].features
+                    overlap = len(features & other)
+                    similarity = overlap / (len(features) + len(other) - overlap)
+                    if similarity >= self.threshold:
+                        candidates.append((similarity, entry_id))
+            candidates.sort(reverse=True)
+
+        similar_found = False
+        for _, entry_id in candidates:
+            entry = self._entries[entry_id]
+            if self._expired(entry):
+                self._remove(entry_id)
+                self.expirations += 1
+                continue
+            similar_found = True
+            if entry.polarity == polarity and self._arguments_match(entry, words):
+                self._entries.move_to_end(entry_id)
+                entry.hits += 1
+                self.hits += 1
+                return copy.deepcopy(entry.plan)
+        if similar_found:
+            self.rejected += 1
+        self.misses += 1
+        return None
+
+    def store(
+        self,
+        query: str,
+        assistants: List[Assistant],
+        plan: Dict[str, Any],
+        history: Sequence[str] = (),
+    ) -> None:
+        """
+        Cache the plan made for a query.
+
+        Args:
+            query (str): The user query.
+            assistants (List[Assistant]): The assistants the plan was made for.
+            plan (Dict[str, Any]): JSON-serializable plan.
+            history (Sequence[str]): Contents of the messages before the
+                query, oldest first.
+        """
+        normalized = _normalize(query)
+        if len(normalized.split()) < self.min_words:
+            return
+        fingerprint = self._scope(assistants, history)
+        existing = self._exact.get((fingerprint, normalized))
+        if existing is not None:
+            self._remove(existing)
+
+        features = _features(normalized)
+        entry = _CacheEntry(
+            fingerprint,
+            normalized,
+            features,
+            self._signature_bands(features),
+            _words(query),
+            copy.deepcopy(plan),
+        )
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = entry
+        self._exact[(fingerprint, normalized)] = entry_id
+        for index, band in enumerate(entry.bands):
+            self._buckets.setdefault((fingerprint, index, band), set()).add(entry_id)
+        self.stores += 1
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def should_verify(self) -> bool:
+        return self.verify_fraction > 0 and self._random.random() < self.verify_fraction
+
+    def record_verification(self, matched: bool) -> None:
+        self.verifications += 1
+        if matched:
+            self.verified_matches += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._exact.clear()
+        self._buckets.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return cache metrics.
+
+        Returns:
+            Dict[str, Any]: Counters plus the hit rate and, if hits were
+            verified, the share of verified hits that matched a fresh plan.
+        """
+        return {
+            "size": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "verifications": self.verifications,
+            "hit_rate": self.hits / self.lookups if self.lookups else None,
+            "accuracy": (
+                self.verified_matches / self.verifications if self.verifications else None
+            ),
+        }
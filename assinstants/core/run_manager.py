@@ -1,51 +1,294 @@
+import asyncio
+import functools
+import inspect
 import json
 import logging
-from typing import List, Dict, Any, Union
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Set, Tuple, Union
 from ..models.run import Run, RunStatus
 from ..models.shared import StepDetails, FunctionCall
 from ..models.assistant import Assistant
 from ..models.message import Message
+from ..models.prompt import StructuredPrompt
+from ..models.event import RunEvent, RunEventType
 from ..core.assistant_manager import AssistantManager
 from ..core.thread_manager import ThreadManager
-from datetime import datetime, timezone
+from ..core.event_bus import EventBus, Subscription
+from ..core.blob_store import BLOB_REFERENCE, BlobStore, is_blob_reference
+from ..core.plan_cache import PlanCache
+from datetime import datetime, timedelta, timezone
 from ..utils.exceptions import (
     RunExecutionError,
+    ConcurrencyError,
     FunctionNotFoundError,
     FunctionExecutionError,
+    DataValidationError,
+    TimeoutError as OperationTimeoutError,
 )
 from ..models.tool import FunctionTool
-from ..models.function import FunctionParameter
+from ..models.function import ExecutionMode, FunctionDefinition
 from ..models.tool import Tool
 from ..utils.logging_utils import log
 
 logger = logging.getLogger(__name__)
 
+_FINISHED = frozenset(
+    (RunStatus.COMPLETED, RunStatus.FAILED, RunStatus.CANCELLED, RunStatus.EXPIRED)
+)
+
+
+def _compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _shrink(value: Any, max_items: int, max_chars: int, depth: int = 0) -> Any:
+    if isinstance(value, str):
+        if len(value) > max_chars:
+            return f"{value[:max_chars]}... ({len(value) - max_chars} more characters)"
+        return value
+    if isinstance(value, (list, tuple)):
+        if depth >= 4:
+            return f"[{len(value)} items]"
+        items = [_shrink(v, max_items, max_chars, depth + 1) for v in value[:max_items]]
+        if len(value) > max_items:
+            items.append(f"... ({len(value) - max_items} more items)")
+        return items
+    if isinstance(value, dict):
+        if depth >= 4:
+            return f"{{{len(value)} keys}}"
+        shrunk = {
+            str(k): _shrink(v, max_items, max_chars, depth + 1)
+            for k, v in list(value.items())[:max_items]
+        }
+        if len(value) > max_items:
+            shrunk["..."] = f"{len(value) - max_items} more keys"
+        return shrunk
+    return value
+
+
+def _summarize_result(value: Any, limit: int) -> str:
+    """
+    Encode a tool result as compact JSON of at most about limit characters.
+
+    Oversized results keep their shape: long strings, lists and objects are
+    cut down with a note of what was left out, tightening until they fit.
+    """
+    encoded = _compact_json(value)
+    for max_items, max_chars in ((20, 500), (10, 200), (5, 100), (2, 40), (1, 20)):
+        if len(encoded) <= limit:
+            break
+        encoded = _compact_json(_shrink(value, max_items, max_chars))
+    if len(encoded) > limit:
+        encoded = f"{encoded[:limit]}... (truncated)"
+    return encoded
+
 
 class RunManager:
     def __init__(
-        self, assistant_manager: AssistantManager, thread_manager: ThreadManager
+        self,
+        assistant_manager: AssistantManager,
+        thread_manager: ThreadManager,
+        max_thread_workers: Optional[int] = None,
+        max_process_workers: Optional[int] = None,
+        llm_timeout: Optional[float] = None,
+        run_timeout: Optional[float] = None,
+        event_buffer_size: int = 100,
+        related_messages: int = 3,
+        max_inline_result_bytes: int = 64 * 1024,
+        max_prompt_result_chars: int = 4000,
+        blob_store: Optional[BlobStore] = None,
+        plan_cache: Optional[PlanCache] = None,
     ):
         self.assistant_manager = assistant_manager
         self.thread_manager = thread_manager
         self.runs: Dict[str, Run] = {}
+        self.max_thread_workers = max_thread_workers
+        self.max_process_workers = max_process_workers
+        self._thread_executor: Optional[ThreadPoolExecutor] = None
+        self._process_executor: Optional[ProcessPoolExecutor] = None
+        self.llm_timeout = llm_timeout
+        self.run_timeout = run_timeout
+        self._run_tasks: Dict[str, "asyncio.Future[Run]"] = {}
+        self._cancel_requests: Set[str] = set()
+        self._queued_waits: Dict[str, "asyncio.Future[Any]"] = {}
+        self.events = EventBus(max_queue=event_buffer_size)
+        self.related_messages = related_messages
+        self.max_inline_result_bytes = max_inline_result_bytes
+        self.max_prompt_result_chars = max_prompt_result_chars
+        self._owns_blob_store = blob_store is None
+        self.blob_store = blob_store or BlobStore()
+        self.plan_cache = plan_cache
+        self._background_tasks: Set["asyncio.Future[None]"] = set()
+
+    def _get_executor(self, mode: ExecutionMode) -> Executor:
+        """
+        Return the shared executor for the given execution mode, creating it on
+        first use so that runs which only use async tools never spawn workers.
+        """
+        if mode == ExecutionMode.PROCESS:
+            if self._process_executor is None:
+                self._process_executor = ProcessPoolExecutor(
+                    max_workers=self.max_process_workers
+                )
+                log("FUNCTION", "Process pool for CPU-bound tools started")
+            return self._process_executor
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(
+                max_workers=self.max_thread_workers,
+                thread_name_prefix="assinstants-tool",
+            )
+            log("FUNCTION", "Thread pool for blocking tools started")
+        return self._thread_executor
 
-    async def create_and_execute_run(self, thread_id: str) -> Run:
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the shared tool executors and, unless a blob store was
+        passed in, delete the blobs of large tool results.
+
+        Args:
+            wait (bool): Whether to block until running tools have finished.
+        """
+        if self._thread_executor is not None:
+            self._thread_executor.shutdown(wait=wait)
+            self._thread_executor = None
+        if self._process_executor is not None:
+            self._process_executor.shutdown(wait=wait)
+            self._process_executor = None
+        if self._owns_blob_store:
+            self.blob_store.close()
+
+    def _publish(
+        self, run: Run, event_type: RunEventType, **data: Any
+    ) -> None:
+        self.events.publish(
+            RunEvent(
+                type=event_type,
+                run_id=run.id,
+                thread_id=run.thread_id,
+                status=run.status,
+                data=data,
+            )
+        )
+
+    def _set_status(self, run: Run, status: RunStatus, **data: Any) -> None:
+        run.status = status
+        self._publish(run, RunEventType.STATUS_CHANGED, **data)
+
+    async def create_and_execute_run(
+        self, thread_id: str, run_id: Optional[str] = None, wait: bool = True
+    ) -> Run:
+        """
+        Create a run for the latest user message on a thread and execute it.
+
+        Runs on the same thread are serialized: a second run waits until the
+        first has finished, or is rejected when wait is False. A run is also
+        rejected if the latest user message has already been answered, so two
+        concurrent runs for one message produce a single reply. Runs on
+        different threads execute concurrently.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            run_id (Optional[str]): ID for the new run, e.g. to subscribe to
+                its events before it starts.
+            wait (bool): Whether to wait for an active run on the thread.
+
+        Returns:
+            Run: The finished run.
+
+        Raises:
+            ConcurrencyError: If wait is False and the thread has an active run,
+                or the latest user message has already been answered.
+            ValueError: If the thread is not found or has no user message.
+        """
         log("THREAD", f"Creating and executing run for thread {thread_id}")
-        messages = await self.thread_manager.get_messages(thread_id)
-        user_query = next(
-            (m.content for m in reversed(messages) if m.role == "user"), None
+        thread = await self.thread_manager.get_thread(thread_id)
+        if not thread.assistants:
+            raise ValueError(f"Thread {thread_id} has no assistants")
+        if not wait and self.thread_manager.is_thread_busy(thread_id):
+            log("ERROR", f"Thread {thread_id} already has an active run", logging.ERROR)
+            raise ConcurrencyError(f"Thread {thread_id} already has an active run")
+
+        # The run is registered before waiting for the thread lock so that it
+        # can be looked up and cancelled while queued.
+        run = Run(thread_id=thread_id, assistant_id=thread.assistants[0].id)
+        if run_id:
+            run.id = run_id
+        self.runs[run.id] = run
+        self._publish(run, RunEventType.STATUS_CHANGED)
+
+        lock = self.thread_manager.thread_lock(thread_id)
+        acquire: "Optional[asyncio.Future[Any]]" = None
+        try:
+            if lock.locked():
+                acquire = asyncio.ensure_future(lock.acquire())
+                self._queued_waits[run.id] = acquire
+                await acquire
+            else:
+                # A free lock is taken without yielding, so a concurrent
+                # wait=False run already finds the thread busy.
+                await lock.acquire()
+        except asyncio.CancelledError:
+            if acquire is not None and acquire.done() and not acquire.cancelled():
+                lock.release()
+            if run.status != RunStatus.CANCELLED:
+                run.cancelled_at = datetime.now(timezone.utc)
+                self._set_status(run, RunStatus.CANCELLED)
+                raise
+            return run
+        finally:
+            self._queued_waits.pop(run.id, None)
+
+        try:
+            if run.status == RunStatus.CANCELLED:
+                return run
+            try:
+                user_query, assistants, messages, related = await self._prepare_run(
+                    thread_id
+                )
+            except (ValueError, ConcurrencyError) as e:
+                run.error = str(e)
+                run.completed_at = datetime.now(timezone.utc)
+                self._set_status(run, RunStatus.FAILED, error=run.error)
+                raise
+            run.assistant_id = assistants[0].id
+            return await self.execute_run(
+                run.id, user_query, assistants, messages[-5:], related
+            )
+        finally:
+            lock.release()
+
+    async def _prepare_run(
+        self, thread_id: str
+    ) -> Tuple[str, List[Assistant], List[Message], List[Message]]:
+        # The run works on a snapshot of the thread taken under the lock.
+        assistants, messages = await self.thread_manager.snapshot_thread(thread_id)
+        if not assistants:
+            raise ValueError(f"Thread {thread_id} has no assistants")
+        query_index = next(
+            (i for i in range(len(messages) - 1, -1, -1) if messages[i].role == "user"),
+            None,
         )
-        if not user_query:
+        if query_index is None or not messages[query_index].content:
             log("ERROR", "No user message found in the thread", logging.ERROR)
             raise ValueError("No user message found in the thread")
+        if query_index < len(messages) - 1:
+            # Another run answered this message while we waited for the lock.
+            log(
+                "ERROR",
+                f"Latest user message on thread {thread_id} was already answered",
+                logging.ERROR,
+            )
+            raise ConcurrencyError(
+                f"Latest user message on thread {thread_id} was already answered"
+            )
+        user_query = messages[query_index].content
 
         log("THREAD", f"User query: {user_query}")
-        thread = await self.thread_manager.get_thread(thread_id)
-        run = Run(thread_id=thread_id, assistant_id=thread.assistants[0].id)
-        self.runs[run.id] = run
-        return await self.execute_run(
-            run.id, user_query, thread.assistants, messages[-5:]
+        # Older messages relevant to the query join the recent ones.
+        related = await self.thread_manager.search_messages(
+            thread_id, user_query, self.related_messages, before=len(messages) - 5
         )
+        return user_query, assistants, messages, related
 
     async def execute_run(
         self,
@@ -53,6 +296,7 @@ class RunManager:
         user_query: str,
         assistants: List[Assistant],
         messages: List[Message],
+        related_messages: Optional[List[Message]] = None,
     ) -> Run:
         log("THREAD", f"Executing run {run_id}")
         run = self.runs.get(run_id)
@@ -60,14 +304,53 @@ class RunManager:
             log("ERROR", f"Invalid run_id: {run_id}", logging.ERROR)
             raise ValueError("Invalid run_id")
 
-        run.status = RunStatus.IN_PROGRESS
         run.started_at = datetime.now(timezone.utc)
+        if self.run_timeout is not None:
+            run.expires_at = run.started_at + timedelta(seconds=self.run_timeout)
+        self._set_status(run, RunStatus.IN_PROGRESS)
         log("THREAD", f"Run {run_id} started at {run.started_at}")
 
+        # The run body executes in its own task so that cancel_run and the run
+        # deadline can interrupt in-flight tools and LLM calls.
+        task = asyncio.ensure_future(
+            self._execute_run_body(
+                run, user_query, assistants, messages, related_messages or []
+            )
+        )
+        self._run_tasks[run_id] = task
+        try:
+            return await asyncio.wait_for(task, timeout=self.run_timeout)
+        except asyncio.TimeoutError:
+            run.error = f"Run exceeded its deadline of {self.run_timeout}s"
+            run.completed_at = datetime.now(timezone.utc)
+            self._set_status(run, RunStatus.EXPIRED, error=run.error)
+            log("ERROR", f"Run {run_id} expired", logging.ERROR)
+            return run
+        except asyncio.CancelledError:
+            run.cancelled_at = datetime.now(timezone.utc)
+            self._set_status(run, RunStatus.CANCELLED)
+            log("THREAD", f"Run {run_id} cancelled at {run.cancelled_at}")
+            if run_id in self._cancel_requests:
+                return run
+            raise
+        finally:
+            self._run_tasks.pop(run_id, None)
+            self._cancel_requests.discard(run_id)
+
+    async def _execute_run_body(
+        self,
+        run: Run,
+        user_query: str,
+        assistants: List[Assistant],
+        messages: List[Message],
+        related_messages: List[Message],
+    ) -> Run:
+        run_id = run.id
         try:
             serializable_messages = self._serialize_messages(messages)
+            serializable_related = self._serialize_messages(related_messages)
             process_result = await self._process_query(
-                user_query, serializable_messages, assistants
+                user_query, serializable_messages, assistants, serializable_related
             )
             run.assistant_id = process_result["assistant_id"]
             run.steps = process_result["steps"]
@@ -82,13 +365,21 @@ class RunManager:
             errors = []
             for step in run.steps:
                 log("STEP", f"Executing step {step.step_number}: {step.description}")
-                try:
-                    step_results = await self._execute_step(run.assistant_id, step)
-                    function_results.extend(step_results)
-                    step.results = step_results
-                except FunctionExecutionError as e:
-                    log("ERROR", f"Function execution error: {str(e)}", logging.ERROR)
-                    errors.append(str(e))
+                self._publish(
+                    run,
+                    RunEventType.STEP_STARTED,
+                    step_number=step.step_number,
+                    description=step.description,
+                )
+                step_results, step_errors = await self._execute_step(run, step)
+                function_results.extend(step_results)
+                errors.extend(step_errors)
+                self._publish(
+                    run,
+                    RunEventType.STEP_COMPLETED,
+                    step_number=step.step_number,
+                    results=step.results,
+                )
 
             final_response = await self._generate_final_response(
                 selected_assistant,
@@ -96,6 +387,7 @@ class RunManager:
                 function_results,
                 serializable_messages,
                 errors,
+                serializable_related,
             )
 
             # Extract the actual response from the JSON
@@ -109,18 +401,22 @@ class RunManager:
                 extracted_response = final_response.strip()
 
             log("THREAD", f"Final response: {extracted_response}")
-            await self.thread_manager.add_message(
+            message = await self.thread_manager.add_message(
                 run.thread_id, "assistant", extracted_response, run.assistant_id
             )
 
-            run.status = RunStatus.COMPLETED
             run.completed_at = datetime.now(timezone.utc)
+            self._set_status(
+                run, RunStatus.COMPLETED, message=message.model_dump(mode="json")
+            )
             log("THREAD", f"Run {run_id} completed at {run.completed_at}")
             return run
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            run.status = RunStatus.FAILED
             run.error = str(e)
+            self._set_status(run, RunStatus.FAILED, error=run.error)
             log("ERROR", f"Run execution failed: {str(e)}", logging.ERROR)
             raise RunExecutionError(f"Run execution failed: {str(e)}")
 
@@ -137,13 +433,6 @@ class RunManager:
             for message in messages
         ]
 
-    def _serialize_function_parameter(self, param: FunctionParameter) -> Dict[str, Any]:
-        return {
-            "type": param.type,
-            "description": param.description,
-            "enum": param.enum,
-        }
-
     def _parse_json_response(self, response: str) -> Union[Dict[str, Any], str]:
         try:
             return json.loads(response)
@@ -167,30 +456,114 @@ class RunManager:
         user_query: str,
         messages: List[Dict[str, Any]],
         assistants: List[Assistant],
+        related_messages: Optional[List[Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
-        available_functions = [
-            {
-                "name": tool.tool.function.name,
-                "description": tool.tool.function.description,
-                "parameters": {
-                    name: self._serialize_function_parameter(param)
-                    for name, param in tool.tool.function.parameters.items()
-                },
-            }
+        if self.plan_cache is None:
+            return await self._plan_query(
+                user_query, messages, assistants, related_messages
+            )
+
+        # The planner sees the conversation too, so cached plans are scoped
+        # to the messages before the query.
+        history = [m["content"] for m in (related_messages or []) + messages]
+        if history and history[-1] == user_query:
+            history.pop()
+        cached = self.plan_cache.lookup(user_query, assistants, history)
+        if cached is not None:
+            log("ASSISTANT", "Reusing cached plan for a similar query")
+            result = self._plan_from_cache(cached, assistants)
+            if self.plan_cache.should_verify():
+                task = asyncio.ensure_future(
+                    self._verify_cached_plan(
+                        user_query, messages, assistants, related_messages, cached, history
+                    )
+                )
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            return result
+
+        result = await self._plan_query(user_query, messages, assistants, related_messages)
+        self.plan_cache.store(
+            user_query, assistants, self._plan_to_cache(result, assistants), history
+        )
+        return result
+
+    def _plan_to_cache(
+        self, result: Dict[str, Any], assistants: List[Assistant]
+    ) -> Dict[str, Any]:
+        # Plans are cached by assistant position so they stay valid for any
+        # run with the same assistant set.
+        index = next(
+            (i for i, a in enumerate(assistants) if a.id == result["assistant_id"]), 0
+        )
+        return {
+            "selected_assistant_index": index,
+            "steps": [step.model_dump(exclude={"results"}) for step in result["steps"]],
+        }
+
+    def _plan_from_cache(
+        self, plan: Dict[str, Any], assistants: List[Assistant]
+    ) -> Dict[str, Any]:
+        return {
+            "assistant_id": assistants[plan["selected_assistant_index"]].id,
+            "steps": [StepDetails(**step) for step in plan["steps"]],
+        }
+
+    async def _verify_cached_plan(
+        self,
+        user_query: str,
+        messages: List[Dict[str, Any]],
+        assistants: List[Assistant],
+        related_messages: Optional[List[Dict[str, Any]]],
+        cached: Dict[str, Any],
+        history: List[str],
+    ) -> None:
+        # Re-plans a sample of cache hits off the run's critical path to
+        # measure how often the cached decision matches a fresh one.
+        assert self.plan_cache is not None
+        try:
+            result = await self._plan_query(
+                user_query, messages, assistants, related_messages
+            )
+        except Exception as e:
+            log("ERROR", f"Plan cache verification failed: {str(e)}", logging.ERROR)
+            return
+        fresh = self._plan_to_cache(result, assistants)
+
+        def decision(plan: Dict[str, Any]) -> Any:
+            return (
+                plan["selected_assistant_index"],
+                [
+                    (call["name"], call["arguments"])
+                    for step in plan["steps"]
+                    for call in step.get("function_calls") or []
+                ],
+            )
+
+        matched = decision(fresh) == decision(cached)
+        self.plan_cache.record_verification(matched)
+        if not matched:
+            log("ASSISTANT", f"Cached plan differed from a fresh one for: {user_query}")
+            self.plan_cache.store(user_query, assistants, fresh, history)
+
+    async def _plan_query(
+        self,
+        user_query: str,
+        messages: List[Dict[str, Any]],
+        assistants: List[Assistant],
+        related_messages: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        available_function_names = {
+            tool.tool.function.name
             for assistant in assistants
             for tool in assistant.tools
             if isinstance(tool.tool, FunctionTool)
-        ]
-
-        prompt = f"""
-Analyze the following user query and determine the necessary steps to respond:
-
-<user_query>
-{user_query}
-</user_query>
+        }
 
-Recent conversation history:
-{self._format_conversation_history(messages[-5:])}
+        # Static parts come first and the per-request parts last, so that
+        # providers can reuse the cached prefix across requests.
+        static_prompt = f"""
+You are planning how to respond to a user query.
 
 Available assistants and their functions:
 {self._format_assistants_and_functions(assistants)}
@@ -221,13 +594,22 @@ Important instructions:
 - Always select an appropriate assistant by setting the selected_assistant_index.
 - Choose the assistant that has the required functions for the task.
 """
+        dynamic_prompt = f"""{self._format_related_messages(related_messages)}
+Recent conversation history:
+{self._format_conversation_history(messages[-5:])}
+
+Analyze the following user query and determine the necessary steps to respond:
+
+<user_query>
+{user_query}
+</user_query>
+"""
+        prompt = StructuredPrompt(static_prompt, dynamic_prompt)
 
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = await assistants[0].custom_llm_function(
-                    assistants[0].model, prompt
-                )
+                response = await self._call_llm(assistants[0], prompt)
                 logger.debug(
                     f"Raw LLM response for process_query (attempt {attempt + 1}): {response}"
                 )
@@ -251,9 +633,6 @@ Important instructions:
                     steps = []
 
                 # Validate function calls
-                available_function_names = set(
-                    func["name"] for func in available_functions
-                )
                 steps = [
                     {
                         **step,
@@ -297,7 +676,7 @@ Important instructions:
                         f"Failed to get a valid response after {max_retries} attempts: {str(e)}"
                     )
 
-        raise ValueError("Unexpected error in _process_query")
+        raise ValueError("Unexpected error in _plan_query")
 
     def _format_conversation_history(self, messages: List[Dict[str, Any]]) -> str:
         formatted_history = ""
@@ -305,6 +684,16 @@ Important instructions:
             formatted_history += f"[{message['role']}]: {message['content']}\n"
         return formatted_history
 
+    def _format_related_messages(
+        self, messages: Optional[List[Dict[str, Any]]]
+    ) -> str:
+        if not messages:
+            return ""
+        return (
+            "\nRelevant earlier messages:\n"
+            f"{self._format_conversation_history(messages)}"
+        )
+
     def _format_available_functions(self, functions: list[Tool]) -> str:
         formatted_functions = ""
         for func in functions:
@@ -312,22 +701,87 @@ Important instructions:
             formatted_functions += f"Description: {func.tool.function.description}\n"
             formatted_functions += "Parameters:\n"
             for param_name, param_details in func.tool.function.parameters.items():
-                formatted_functions += f"  - {param_name}: {param_details.type} - {param_details.description}\n"
+                optional = "" if param_details.required else " (optional)"
+                formatted_functions += f"  - {param_name}: {param_details.type}{optional} - {param_details.description}\n"
             formatted_functions += "\n"
         return formatted_functions
 
     async def _execute_step(
-        self, assistant_id: str, step: StepDetails
-    ) -> List[Dict[str, Any]]:
+        self, run: Run, step: StepDetails
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
         log("STEP", f"Executing step {step.step_number}: {step.description}")
+        # Full results feed the prompt; the run keeps size-bounded copies. A
+        # failed call is recorded in place of its result and doesn't discard
+        # the results of the other calls in the step.
         results = []
-        assistant = await self.assistant_manager.get_assistant(assistant_id)
+        stored_results: List[Dict[str, Any]] = []
+        errors = []
+        assistant = await self.assistant_manager.get_assistant(run.assistant_id)
         if step.function_calls:
             for function_call in step.function_calls:
                 log("FUNCTION", f"Executing function: {function_call.name}")
-                result = await self._execute_function(assistant, function_call)
+                try:
+                    result = await self._execute_function(assistant, function_call)
+                except FunctionExecutionError as e:
+                    log("ERROR", f"Function execution error: {str(e)}", logging.ERROR)
+                    errors.append(str(e))
+                    stored_results.append({function_call.name: {"error": str(e)}})
+                    self._publish(
+                        run,
+                        RunEventType.ERROR,
+                        step_number=step.step_number,
+                        name=function_call.name,
+                        error=str(e),
+                    )
+                    continue
+                stored = await self._store_result(function_call.name, result)
                 results.append({function_call.name: result})
-        return results
+                stored_results.append({function_call.name: stored})
+                self._publish(
+                    run,
+                    RunEventType.TOOL_RESULT,
+                    step_number=step.step_number,
+                    name=function_call.name,
+                    result=stored,
+                )
+        step.results = stored_results
+        return results, errors
+
+    async def _store_result(self, name: str, result: Any) -> Any:
+        """
+        Return the result to keep on the run, moving large ones to the blob store.
+        """
+        data = _compact_json(result).encode("utf-8")
+        if len(data) <= self.max_inline_result_bytes:
+            return result
+        loop = asyncio.get_running_loop()
+        blob_id = await loop.run_in_executor(
+            self._get_executor(ExecutionMode.THREAD), self.blob_store.put, data
+        )
+        log("FUNCTION", f"Stored {len(data)} byte result of {name} as blob {blob_id}")
+        return {
+            BLOB_REFERENCE: blob_id,
+            "size": len(data),
+            "preview": _summarize_result(result, 200),
+        }
+
+    def load_result(self, result: Any) -> Any:
+        """
+        Resolve a result stored on a run step, reading it back from the blob
+        store if it was stored by reference.
+
+        Args:
+            result (Any): A value from step.results.
+
+        Returns:
+            Any: The full tool result.
+
+        Raises:
+            StorageError: If the referenced blob can't be read.
+        """
+        if is_blob_reference(result):
+            return json.loads(self.blob_store.get(result[BLOB_REFERENCE]))
+        return result
 
     async def _execute_function(
         self, assistant: Assistant, function_call: FunctionCall
@@ -345,10 +799,29 @@ Important instructions:
             log("ERROR", f"Function {function_call.name} not found", logging.ERROR)
             raise FunctionNotFoundError(f"Function {function_call.name} not found")
 
+        # Reject bad arguments before any tool I/O happens.
         try:
-            result = await function_tool.implementation(**function_call.arguments)
+            arguments = function_tool.validate_arguments(function_call.arguments)
+        except DataValidationError as e:
+            log("ERROR", str(e), logging.ERROR)
+            raise FunctionExecutionError(str(e))
+
+        try:
+            result = await asyncio.wait_for(
+                self._invoke_implementation(function_tool, arguments),
+                timeout=function_tool.timeout,
+            )
             log("FUNCTION", f"Function {function_call.name} executed successfully")
             return result
+        except asyncio.TimeoutError:
+            log(
+                "ERROR",
+                f"Function {function_call.name} timed out after {function_tool.timeout}s",
+                logging.ERROR,
+            )
+            raise FunctionExecutionError(
+                f"Function {function_call.name} timed out after {function_tool.timeout}s"
+            )
         except Exception as e:
             log(
                 "ERROR",
@@ -359,6 +832,41 @@ Important instructions:
                 f"Error executing function {function_call.name}: {str(e)}"
             )
 
+    async def _invoke_implementation(
+        self, function: FunctionDefinition, arguments: Dict[str, Any]
+    ) -> Any:
+        if function.execution_mode == ExecutionMode.ASYNC:
+            result = function.implementation(**arguments)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
+        # Thread and process modes keep blocking work off the event loop.
+        # Process-mode implementations and their arguments must be picklable.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(function.execution_mode),
+            functools.partial(function.implementation, **arguments),
+        )
+
+    async def _call_llm(self, assistant: Assistant, prompt: str) -> str:
+        try:
+            return await asyncio.wait_for(
+                assistant.custom_llm_function(
+                    assistant.model, prompt, **assistant.provider_config
+                ),
+                timeout=self.llm_timeout,
+            )
+        except asyncio.TimeoutError:
+            log(
+                "ERROR",
+                f"LLM call to model {assistant.model} timed out after {self.llm_timeout}s",
+                logging.ERROR,
+            )
+            raise OperationTimeoutError(
+                f"LLM call to model {assistant.model} timed out after {self.llm_timeout}s"
+            )
+
     async def _generate_final_response(
         self,
         selected_assistant: Assistant,
@@ -366,24 +874,10 @@ Important instructions:
         function_results: List[Dict[str, Any]],
         messages: List[Dict[str, Any]],
         errors: List[str],
+        related_messages: Optional[List[Dict[str, Any]]] = None,
     ) -> str:
         logger.info("Generating final response")
-        prompt = f"""
-Generate a natural, conversational response to the following user query:
-
-<user_query>
-{user_query}
-</user_query>
-
-Recent conversation history:
-{self._format_conversation_history(messages[-5:])}
-
-Function results:
-{self._format_function_results(function_results)}
-
-Errors encountered:
-{self._format_errors(errors)}
-
+        static_prompt = f"""
 Assistant Instructions:
 {selected_assistant.instructions}
 
@@ -412,11 +906,26 @@ Important instructions:
 - Use the available functions if they are relevant to the user's query.
 - If no functions are needed, provide an empty list for "function_calls".
 """
+        dynamic_prompt = f"""{self._format_related_messages(related_messages)}
+Recent conversation history:
+{self._format_conversation_history(messages[-5:])}
+
+Function results:
+{self._format_function_results(function_results)}
+
+Errors encountered:
+{self._format_errors(errors)}
+
+Generate a natural, conversational response to the following user query:
+
+<user_query>
+{user_query}
+</user_query>
+"""
+        prompt = StructuredPrompt(static_prompt, dynamic_prompt)
         logger.debug(f"Final response prompt: {prompt}")
 
-        response = await selected_assistant.custom_llm_function(
-            selected_assistant.model, prompt
-        )
+        response = await self._call_llm(selected_assistant, prompt)
         logger.debug(f"Raw LLM response for final response: {response}")
 
         parsed_response = self._parse_json_response(response)
@@ -434,7 +943,7 @@ Important instructions:
                             )
                             parsed_response[
                                 "response"
-                            ] += f"\n\nFunction result: {result}"
+                            ] += f"\n\nFunction result: {_summarize_result(result, self.max_prompt_result_chars)}"
                         except Exception as e:
                             parsed_response[
                                 "response"
@@ -452,7 +961,7 @@ Important instructions:
         for result in function_results:
             for func_name, func_result in result.items():
                 formatted_results += f"Function: {func_name}\n"
-                formatted_results += f"Result: {json.dumps(func_result, indent=2)}\n\n"
+                formatted_results += f"Result: {_summarize_result(func_result, self.max_prompt_result_chars)}\n\n"
         return formatted_results or "No function results available."
 
     def _format_errors(self, errors: List[str]) -> str:
@@ -464,6 +973,67 @@ Important instructions:
             raise ValueError(f"Run with id {run_id} not found")
         return run
 
+    def subscribe(
+        self,
+        run_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        max_queue: Optional[int] = None,
+    ) -> Subscription:
+        """
+        Subscribe to run events instead of polling get_run.
+
+        Args:
+            run_id (Optional[str]): Follow a single run; the subscription ends
+                after the run's terminal status event.
+            thread_id (Optional[str]): Follow every run on a thread.
+            max_queue (Optional[int]): Events buffered before the oldest are
+                dropped. Defaults to event_buffer_size.
+
+        Returns:
+            Subscription: Await `get()` or iterate with `async for`.
+        """
+        return self.events.subscribe(run_id, thread_id, max_queue)
+
+    async def cancel_run(self, run_id: str) -> Run:
+        """
+        Cancel a run, interrupting any in-flight tool or LLM call.
+
+        Tools running in the thread or process pools cannot be interrupted;
+        their results are discarded once they finish.
+
+        Args:
+            run_id (str): The ID of the run to cancel.
+
+        Returns:
+            Run: The run, in the cancelled state unless it had already finished.
+
+        Raises:
+            ValueError: If the run with the given ID is not found.
+        """
+        run = await self.get_run(run_id)
+        task = self._run_tasks.get(run_id)
+        if run.status in _FINISHED or (task is not None and task.done()):
+            # The body may have finished before execute_run unregistered it.
+            return run
+        if task is None:
+            if run.status == RunStatus.QUEUED:
+                run.cancelled_at = datetime.now(timezone.utc)
+                self._set_status(run, RunStatus.CANCELLED)
+                # Stop waiting for the thread lock, which also frees whatever
+                # the caller holds for the run, such as a server slot.
+                waiter = self._queued_waits.get(run_id)
+                if waiter is not None:
+                    waiter.cancel()
+                log("THREAD", f"Run {run_id} cancelled before it started")
+            return run
+
+        self._set_status(run, RunStatus.CANCELLING)
+        self._cancel_requests.add(run_id)
+        task.cancel()
+        log("THREAD", f"Cancelling run {run_id}")
+        await asyncio.wait([task])
+        return run
+
     def _format_assistants_and_functions(self, assistants: List[Assistant]) -> str:
         formatted_output = ""
         for index, assistant in enumerate(assistants):
@@ -476,9 +1046,8 @@ Important instructions:
                     formatted_output += f"  - {func.name}: {func.description}\n"
                     formatted_output += "    Parameters:\n"
                     for param_name, param in func.parameters.items():
-                        formatted_output += (
-                            f"      {param_name}: {param.type} - {param.description}\n"
-                        )
+                        optional = "" if param.required else " (optional)"
+                        formatted_output += f"      {param_name}: {param.type}{optional} - {param.description}\n"
                         if param.enum:
                             formatted_output += (
                                 f"Allowed values: {', '.join(param.enum)}\n"
@@ -0,0 +1,419 @@
+# core/sharded_run_manager.py
+import asyncio
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import threading
+import uuid
+import weakref
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from ..models.assistant import Assistant
+from ..models.message import Message
+from ..models.run import Run
+from ..models.thread import Thread
+from ..models.tool import Tool
+from ..utils.exceptions import ConcurrencyError, RunExecutionError
+from ..utils.logging_utils import log
+from .assistant_manager import AssistantManager
+from .run_manager import RunManager
+from .thread_manager import ThreadManager
+
+
+def _encode(request_id: str, ok: bool, payload: Any) -> bytes:
+    try:
+        return pickle.dumps((request_id, ok, payload))
+    except Exception as e:
+        error = RunExecutionError(f"Result could not be sent to the parent process: {e}")
+        return pickle.dumps((request_id, False, error))
+
+
+async def _handle_request(
+    assistant_manager: AssistantManager,
+    thread_manager: ThreadManager,
+    run_manager: RunManager,
+    op: str,
+    args: Tuple[Any, ...],
+) -> Any:
+    if op == "register_assistant":
+        assistant: Assistant = args[0]
+        assistant_manager.assistants[assistant.id] = assistant
+        # Threads hold their own references, so refresh any stale replicas.
+        for thread in thread_manager.threads.values():
+            thread.assistants = [
+                assistant if a.id == assistant.id else a for a in thread.assistants
+            ]
+        return None
+    if op == "create_thread":
+        return await thread_manager.create_thread(args[0])
+    if op == "add_assistant_to_thread":
+        thread_id, assistant_id = args
+        replica = await assistant_manager.get_assistant(assistant_id)
+        return await thread_manager.add_assistant_to_thread(thread_id, replica)
+    if op == "remove_assistant_from_thread":
+        return await thread_manager.remove_assistant_from_thread(*args)
+    if op == "add_message":
+        return await thread_manager.add_message(*args)
+    if op == "get_messages":
+        return list(await thread_manager.get_messages(*args))
+    if op == "create_and_execute_run":
+        return await run_manager.create_and_execute_run(*args)
+    if op == "get_run":
+        return await run_manager.get_run(*args)
+    if op == "cancel_run":
+        return await run_manager.cancel_run(*args)
+    raise ValueError(f"Unknown operation: {op}")
+
+
+async def _serve_shard(
+    requests: Any, responses: Any, run_manager_kwargs: Dict[str, Any]
+) -> None:
+    assistant_manager = AssistantManager()
+    thread_manager = ThreadManager()
+    run_manager = RunManager(assistant_manager, thread_manager, **run_manager_kwargs)
+    loop = asyncio.get_running_loop()
+    in_flight: set = set()
+
+    async def respond(request_id: str, op: str, args: Tuple[Any, ...]) -> None:
+        try:
+            result = await _handle_request(
+                assistant_manager, thread_manager, run_manager, op, args
+            )
+            message = _encode(request_id, True, result)
+        except Exception as e:
+            message = _encode(request_id, False, e)
+        responses.put(message)
+
+    while True:
+        raw = await loop.run_in_executor(None, requests.get)
+        if raw is None:
+            break
+        request_id, op, args = pickle.loads(raw)
+        # Requests are handled concurrently; a long run must not block
+        # message or thread operations on the same shard.
+        task = asyncio.ensure_future(respond(request_id, op, args))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
+    run_manager.shutdown()
+
+
+def _stop_workers(request_queues: List[Any], processes: List[Any]) -> None:
+    # Workers are not daemonic, so they would keep the interpreter from
+    # exiting if stop() was never awaited.
+    for requests in request_queues:
+        try:
+            requests.put(None)
+        except (OSError, ValueError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+
+def _shard_main(
+    requests: Any, responses: Any, run_manager_kwargs: Dict[str, Any]
+) -> None:
+    asyncio.run(_serve_shard(requests, responses, run_manager_kwargs))
+
+
+class ShardedRunManager:
+    """
+    Serves threads and runs from several worker processes.
+
+    Each thread lives in exactly one worker, chosen by hashing its ID, so all
+    of a thread's messages and runs stay local to that process. Assistant
+    definitions are replicated to every worker. Callables referenced by
+    assistants and tools must be picklable (module-level functions).
+    """
+
+    def __init__(
+        self,
+        num_workers: Optional[int] = None,
+        start_method: str = "spawn",
+        **run_manager_kwargs: Any,
+    ) -> None:
+        """
+        Initialize the ShardedRunManager.
+
+        Args:
+            num_workers (Optional[int]): Number of worker processes. Defaults to
+                the number of CPUs.
+            start_method (str): The multiprocessing start method for workers.
+            **run_manager_kwargs: Keyword arguments passed to each worker's
+                RunManager (e.g. run_timeout, max_thread_workers).
+        """
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self.run_manager_kwargs = run_manager_kwargs
+        self.assistant_manager = AssistantManager()
+        self._processes: List[Any] = []
+        self._request_queues: List[Any] = []
+        self._response_queue: Any = None
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Pending requests by id, with the shard each was sent to.
+        self._pending: Dict[str, Tuple[int, "asyncio.Future[Any]"]] = {}
+        self._dead_shards: Dict[int, str] = {}
+        self._stopping = False
+        self._watcher: Optional[threading.Thread] = None
+        # Shards of runs in progress; finished runs are found by broadcast.
+        self._run_shards: Dict[str, int] = {}
+        self._finalizer: Optional[weakref.finalize] = None
+
+    async def __aenter__(self) -> "ShardedRunManager":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """
+        Start the worker processes.
+        """
+        if self._processes:
+            return
+        context: Any = multiprocessing.get_context(self.start_method)
+        self._loop = asyncio.get_running_loop()
+        self._stopping = False
+        self._dead_shards = {}
+        self._response_queue = context.Queue()
+        for index in range(self.num_workers):
+            requests = context.Queue()
+            process = context.Process(
+                target=_shard_main,
+                args=(requests, self._response_queue, self.run_manager_kwargs),
+                name=f"assinstants-shard-{index}",
+                # Daemonic processes can't have children, which process-mode
+                # tools need for the RunManager's process pool.
+                daemon=False,
+            )
+            process.start()
+            self._request_queues.append(requests)
+            self._processes.append(process)
+        self._reader = threading.Thread(
+            target=self._read_responses, name="assinstants-shard-reader", daemon=True
+        )
+        self._reader.start()
+        self._watcher = threading.Thread(
+            target=self._watch_workers,
+            args=(list(self._processes),),
+            name="assinstants-shard-watcher",
+            daemon=True,
+        )
+        self._watcher.start()
+        self._finalizer = weakref.finalize(
+            self, _stop_workers, list(self._request_queues), list(self._processes)
+        )
+        log("THREAD", f"Started {self.num_workers} shard worker processes")
+
+        try:
+            for assistant in self.assistant_manager.assistants.values():
+                await self._broadcast("register_assistant", assistant)
+        except Exception:
+            await self.stop()
+            raise
+
+    async def stop(self) -> None:
+        """
+        Stop the worker processes after their in-flight requests finish.
+        """
+        if not self._processes:
+            return
+        self._stopping = True
+        for requests in self._request_queues:
+            requests.put(None)
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join)
+        self._response_queue.put(None)
+        if self._reader is not None:
+            await loop.run_in_executor(None, self._reader.join)
+        if self._watcher is not None:
+            await loop.run_in_executor(None, self._watcher.join)
+            self._watcher = None
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
+        self._processes = []
+        self._request_queues = []
+        self._reader = None
+        log("THREAD", "Stopped shard worker processes")
+
+    def shard_for(self, thread_id: str) -> int:
+        """
+        Return the index of the worker that owns the given thread.
+        """
+        return zlib.crc32(thread_id.encode("utf-8")) % self.num_workers
+
+    def _read_responses(self) -> None:
+        while True:
+            raw = self._response_queue.get()
+            if raw is None:
+                return
+            request_id, ok, payload = pickle.loads(raw)
+            assert self._loop is not None
+            self._loop.call_soon_threadsafe(self._resolve, request_id, ok, payload)
+
+    def _watch_workers(self, processes: List[Any]) -> None:
+        # Fails the requests of a worker that exits unexpectedly, which would
+        # otherwise never get a response.
+        sentinels = {process.sentinel: index for index, process in enumerate(processes)}
+        while sentinels:
+            for sentinel in multiprocessing.connection.wait(list(sentinels)):
+                index = sentinels.pop(sentinel)
+                if self._stopping:
+                    continue
+                processes[index].join(timeout=1)
+                assert self._loop is not None
+                self._loop.call_soon_threadsafe(
+                    self._fail_shard, index, processes[index].exitcode
+                )
+
+    def _fail_shard(self, shard: int, exitcode: Optional[int]) -> None:
+        message = f"Shard worker {shard} exited unexpectedly with code {exitcode}"
+        log("ERROR", message, logging.ERROR)
+        self._dead_shards[shard] = message
+        for request_id, (request_shard, future) in list(self._pending.items()):
+            if request_shard == shard:
+                del self._pending[request_id]
+                if not future.done():
+                    future.set_exception(RunExecutionError(message))
+
+    def _resolve(self, request_id: str, ok: bool, payload: Any) -> None:
+        pending = self._pending.pop(request_id, None)
+        if pending is None:
+            return
+        future = pending[1]
+        if future.done():
+            return
+        if ok:
+            future.set_result(payload)
+        else:
+            future.set_exception(payload)
+
+    async def _submit(self, shard: int, op: str, *args: Any) -> Any:
+        if not self._processes:
+            raise ConcurrencyError("ShardedRunManager has not been started")
+        if shard in self._dead_shards:
+            raise RunExecutionError(self._dead_shards[shard])
+        request_id = str(uuid.uuid4())
+        raw = pickle.dumps((request_id, op, args))
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = (shard, future)
+        self._request_queues[shard].put(raw)
+        try:
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _broadcast(self, op: str, *args: Any) -> List[Any]:
+        return await asyncio.gather(
+            *(self._submit(shard, op, *args) for shard in range(self.num_workers))
+        )
+
+    async def _submit_to_run_shard(self, op: str, run_id: str) -> Run:
+        shard = self._run_shards.get(run_id)
+        if shard is not None:
+            return await self._submit(shard, op, run_id)
+        results = await asyncio.gather(
+            *(self._submit(s, "get_run", run_id) for s in range(self.num_workers)),
+            return_exceptions=True,
+        )
+        for shard, result in enumerate(results):
+            if isinstance(result, Run):
+                return await self._submit(shard, op, run_id)
+        raise ValueError(f"Run with id {run_id} not found")
+
+    async def create_assistant(
+        self,
+        name: str,
+        instructions: str,
+        model: str,
+        custom_llm_function: Callable,
+        tools: List[Tool] = [],
+        temperature: float = 0.7,
+        **kwargs: Any,
+    ) -> Assistant:
+        assistant = await self.assistant_manager.create_assistant(
+            name, instructions, model, custom_llm_function, tools, temperature, **kwargs
+        )
+        if self._processes:
+            await self._broadcast("register_assistant", assistant)
+        return assistant
+
+    async def add_tool(self, assistant_id: str, tool: Tool) -> Assistant:
+        assistant = await self.assistant_manager.add_tool(assistant_id, tool)
+        if self._processes:
+            await self._broadcast("register_assistant", assistant)
+        return assistant
+
+    async def create_thread(self) -> Thread:
+        thread_id = str(uuid.uuid4())
+        return await self._submit(self.shard_for(thread_id), "create_thread", thread_id)
+
+    async def add_assistant_to_thread(
+        self, thread_id: str, assistant: Assistant
+    ) -> None:
+        if assistant.id not in self.assistant_manager.assistants:
+            self.assistant_manager.assistants[assistant.id] = assistant
+            await self._broadcast("register_assistant", assistant)
+        await self._submit(
+            self.shard_for(thread_id), "add_assistant_to_thread", thread_id, assistant.id
+        )
+
+    async def remove_assistant_from_thread(
+        self, thread_id: str, assistant_id: str
+    ) -> None:
+        await self._submit(
+            self.shard_for(thread_id),
+            "remove_assistant_from_thread",
+            thread_id,
+            assistant_id,
+        )
+
+    async def add_message(
+        self,
+        thread_id: str,
+        role: str,
+        content: str,
+        assistant_id: Optional[str] = None,
+    ) -> Message:
+        return await self._submit(
+            self.shard_for(thread_id),
+            "add_message",
+            thread_id,
+            role,
+            content,
+            assistant_id,
+        )
+
+    async def get_messages(self, thread_id: str) -> List[Message]:
+        return await self._submit(self.shard_for(thread_id), "get_messages", thread_id)
+
+    async def create_and_execute_run(
+        self, thread_id: str, run_id: Optional[str] = None, wait: bool = True
+    ) -> Run:
+        # The run's shard is recorded while it executes so that get_run and
+        # cancel_run reach it without asking every worker.
+        run_id = run_id or str(uuid.uuid4())
+        shard = self.shard_for(thread_id)
+        self._run_shards[run_id] = shard
+        try:
+            return await self._submit(
+                shard, "create_and_execute_run", thread_id, run_id, wait
+            )
+        finally:
+            self._run_shards.pop(run_id, None)
+
+    async def get_run(self, run_id: str) -> Run:
+        return await self._submit_to_run_shard("get_run", run_id)
+
+    async def cancel_run(self, run_id: str) -> Run:
+        return await self._submit_to_run_shard("cancel_run", run_id)
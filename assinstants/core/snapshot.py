@@ -0,0 +1,384 @@
+# core/snapshot.py
+import json
+import logging
+import os
+import struct
+import zlib
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from ..models.assistant import Assistant
+from ..models.function import FunctionDefinition
+from ..models.message import Message
+from ..models.run import Run, RunStatus
+from ..models.thread import Thread
+from ..models.tool import FunctionTool, Tool
+from ..utils.exceptions import StorageError
+from ..utils.logging_utils import log
+from .assistant_manager import AssistantManager
+from .blob_store import BLOB_REFERENCE, is_blob_reference
+from .run_manager import RunManager
+from .thread_manager import ThreadManager
+
+MAGIC = b"ASNSNAP\x01"
+_RECORD_HEADER = struct.Struct(">cI")
+_ASSISTANT = b"A"
+_THREAD = b"T"
+_MESSAGES = b"M"
+_RUN = b"R"
+_BLOB = b"B"
+_END = b"E"
+
+
+class CallableRegistry:
+    """
+    Maps callables to stable names so snapshots can refer to them.
+
+    Register every custom_llm_function and tool implementation under the same
+    name in the process that writes a snapshot and the one that restores it.
+    """
+
+    def __init__(self) -> None:
+        self._by_name: Dict[str, Callable] = {}
+        self._names: Dict[Any, str] = {}
+
+    def register(self, name: str, function: Optional[Callable] = None) -> Any:
+        """
+        Register a callable under a name. Usable as a decorator.
+
+        Args:
+            name (str): The name stored in snapshots.
+            function (Optional[Callable]): The callable. If omitted, a decorator
+                is returned.
+
+        Returns:
+            The callable, or a decorator registering it.
+        """
+        if function is None:
+            return lambda f: self.register(name, f)
+        self._by_name[name] = function
+        try:
+            self._names[function] = name
+        except TypeError:
+            pass
+        return function
+
+    def name_of(self, function: Callable) -> str:
+        try:
+            name = self._names.get(function)
+        except TypeError:
+            name = None
+        if name is None:
+            name = next(
+                (n for n, f in self._by_name.items() if f is function or f == function),
+                None,
+            )
+        if name is None:
+            raise StorageError(
+                f"Callable {function!r} is not registered; register it before snapshotting"
+            )
+        return name
+
+    def resolve(self, name: str) -> Callable:
+        function = self._by_name.get(name)
+        if function is None:
+            raise StorageError(f"No callable registered under the name {name!r}")
+        return function
+
+
+registry = CallableRegistry()
+
+
+def _write_record(out: BinaryIO, kind: bytes, data: Any) -> None:
+    payload = zlib.compress(
+        json.dumps(data, separators=(",", ":"), default=str).encode("utf-8")
+    )
+    out.write(_RECORD_HEADER.pack(kind, len(payload)))
+    out.write(payload)
+
+
+def _read_payload(payload: bytes) -> Any:
+    return json.loads(zlib.decompress(payload))
+
+
+def _iter_records(source: BinaryIO) -> Iterator[Tuple[bytes, int, int]]:
+    """
+    Yield (kind, offset, length) for each record without reading payloads.
+    """
+    while True:
+        header = source.read(_RECORD_HEADER.size)
+        if len(header) < _RECORD_HEADER.size:
+            raise StorageError("Snapshot is truncated")
+        kind, length = _RECORD_HEADER.unpack(header)
+        if kind == _END:
+            return
+        offset = source.tell()
+        yield kind, offset, length
+        source.seek(offset + length)
+
+
+def _write_run_blobs(out: BinaryIO, run_manager: RunManager) -> None:
+    """
+    Copy the blobs that runs refer to, which would not outlive a temporary
+    blob store. They are stored raw and re-added by content on restore.
+    """
+    blob_ids: Set[str] = set()
+    for run in list(run_manager.runs.values()):
+        for step in run.steps:
+            for result in step.results or []:
+                for value in result.values():
+                    if is_blob_reference(value):
+                        blob_ids.add(value[BLOB_REFERENCE])
+    for blob_id in sorted(blob_ids):
+        try:
+            data = run_manager.blob_store.get(blob_id)
+        except StorageError as e:
+            log("ERROR", f"Blob {blob_id} left out of the snapshot: {e}", logging.ERROR)
+            continue
+        payload = zlib.compress(data)
+        out.write(_RECORD_HEADER.pack(_BLOB, len(payload)))
+        out.write(payload)
+
+
+def _encode_assistant(assistant: Assistant, names: CallableRegistry) -> Dict[str, Any]:
+    data = assistant.model_dump(
+        mode="json", exclude={"custom_llm_function", "tools"}
+    )
+    data["custom_llm_function"] = names.name_of(assistant.custom_llm_function)
+    data["tools"] = []
+    for tool in assistant.tools:
+        function = tool.tool.function
+        function_data = function.model_dump(mode="json", exclude={"implementation"})
+        function_data["implementation"] = names.name_of(function.implementation)
+        data["tools"].append({"type": tool.tool.type, "function": function_data})
+    return data
+
+
+def _decode_assistant(data: Dict[str, Any], names: CallableRegistry) -> Assistant:
+    tools = []
+    for tool_data in data.pop("tools"):
+        function_data = tool_data["function"]
+        function_data["implementation"] = names.resolve(function_data["implementation"])
+        tools.append(
+            Tool(
+                tool=FunctionTool(
+                    type=tool_data["type"],
+                    function=FunctionDefinition(**function_data),
+                )
+            )
+        )
+    data["custom_llm_function"] = names.resolve(data["custom_llm_function"])
+    return Assistant(tools=tools, **data)
+
+
+def _encode_message(message: Message) -> List[Any]:
+    return [
+        message.role,
+        message.content,
+        message.assistant_id,
+        message.created_at.isoformat() if message.created_at else None,
+    ]
+
+
+def _decode_message(data: List[Any]) -> Message:
+    role, content, assistant_id, created_at = data
+    return Message(
+        role=role,
+        content=content,
+        assistant_id=assistant_id,
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+    )
+
+
+class LazyThread:
+    """
+    A thread stored in a snapshot whose messages are decoded on first access.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        header: Dict[str, Any],
+        chunks: List[Tuple[int, int]],
+        assistants: Dict[str, Assistant],
+    ) -> None:
+        self.path = path
+        self.header = header
+        self.chunks = chunks
+        self.assistants = assistants
+
+    def load(self) -> Thread:
+        messages: List[Message] = []
+        with open(self.path, "rb") as source:
+            for offset, length in self.chunks:
+                source.seek(offset)
+                messages.extend(
+                    _decode_message(m) for m in _read_payload(source.read(length))
+                )
+        assistants = [
+            self.assistants[assistant_id]
+            for assistant_id in self.header["assistant_ids"]
+            if assistant_id in self.assistants
+        ]
+        return Thread(id=self.header["id"], messages=messages, assistants=assistants)
+
+    def copy_records(self, out: BinaryIO) -> List[Tuple[int, int]]:
+        # Re-snapshotting an unloaded thread copies its records verbatim and
+        # reports where they landed in the new file.
+        _write_record(out, _THREAD, self.header)
+        chunks = []
+        with open(self.path, "rb") as source:
+            for offset, length in self.chunks:
+                source.seek(offset)
+                out.write(_RECORD_HEADER.pack(_MESSAGES, length))
+                chunks.append((out.tell(), length))
+                out.write(source.read(length))
+        return chunks
+
+
+def save_snapshot(
+    path: str,
+    assistant_manager: AssistantManager,
+    thread_manager: ThreadManager,
+    run_manager: Optional[RunManager] = None,
+    names: CallableRegistry = registry,
+    chunk_size: int = 1000,
+) -> None:
+    """
+    Write the state of the managers to a snapshot file.
+
+    Records are compressed and written one at a time, with messages in chunks
+    of chunk_size, so the snapshot never needs a second copy of the state in
+    memory. The file is written next to path and moved into place at the end.
+    If the run manager's blob store is temporary, the blobs holding its runs'
+    large tool results are copied into the snapshot as well.
+
+    Args:
+        path (str): Destination file.
+        assistant_manager (AssistantManager): Assistants to save.
+        thread_manager (ThreadManager): Threads and messages to save.
+        run_manager (Optional[RunManager]): Runs to save.
+        names (CallableRegistry): Registry naming LLM functions and tools.
+        chunk_size (int): Messages per record.
+
+    Raises:
+        StorageError: If a callable is not registered or the file can't be written.
+    """
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, "wb") as out:
+            out.write(MAGIC)
+            for assistant in assistant_manager.assistants.values():
+                _write_record(out, _ASSISTANT, _encode_assistant(assistant, names))
+            for thread in list(thread_manager.threads.values()):
+                messages = thread.messages[:]
+                _write_record(
+                    out,
+                    _THREAD,
+                    {
+                        "id": thread.id,
+                        "assistant_ids": [a.id for a in thread.assistants],
+                        "message_count": len(messages),
+                    },
+                )
+                for start in range(0, len(messages), chunk_size):
+                    chunk = messages[start : start + chunk_size]
+                    _write_record(out, _MESSAGES, [_encode_message(m) for m in chunk])
+            relocated = [
+                (lazy_thread, lazy_thread.copy_records(out))
+                for lazy_thread in list(thread_manager.unloaded_threads.values())
+            ]
+            if run_manager is not None:
+                for run in list(run_manager.runs.values()):
+                    _write_record(out, _RUN, run.model_dump(mode="json"))
+                if run_manager.blob_store.temporary:
+                    _write_run_blobs(out, run_manager)
+            out.write(_RECORD_HEADER.pack(_END, 0))
+        os.replace(temp_path, path)
+    except OSError as e:
+        raise StorageError(f"Failed to write snapshot {path}: {e}")
+    for lazy_thread, chunks in relocated:
+        if lazy_thread.path == os.path.abspath(path):
+            lazy_thread.chunks = chunks
+    log("THREAD", f"Snapshot written to {path}")
+
+
+def load_snapshot(
+    path: str,
+    assistant_manager: AssistantManager,
+    thread_manager: ThreadManager,
+    run_manager: Optional[RunManager] = None,
+    names: CallableRegistry = registry,
+    lazy: bool = True,
+) -> None:
+    """
+    Restore manager state from a snapshot file.
+
+    With lazy=True only the record layout of each thread is read; its messages
+    are decoded the first time the thread is accessed. The file must then stay
+    in place until every thread has been loaded or a new snapshot is written.
+    Runs that were still active when the snapshot was taken are marked failed,
+    and blobs copied into the snapshot are added to the run manager's blob store.
+
+    Args:
+        path (str): Snapshot file written by save_snapshot.
+        assistant_manager (AssistantManager): Receives the assistants.
+        thread_manager (ThreadManager): Receives the threads.
+        run_manager (Optional[RunManager]): Receives the runs.
+        names (CallableRegistry): Registry resolving LLM functions and tools.
+        lazy (bool): Whether to defer decoding messages.
+
+    Raises:
+        StorageError: If the file is not a valid snapshot or a callable is
+            not registered.
+    """
+    path = os.path.abspath(path)
+    pending: Optional[LazyThread] = None
+    try:
+        with open(path, "rb") as source:
+            if source.read(len(MAGIC)) != MAGIC:
+                raise StorageError(f"{path} is not an assinstants snapshot")
+            for kind, offset, length in _iter_records(source):
+                if kind == _MESSAGES:
+                    if pending is None:
+                        raise StorageError("Snapshot has messages outside a thread")
+                    pending.chunks.append((offset, length))
+                    continue
+                if kind == _BLOB:
+                    if run_manager is not None:
+                        run_manager.blob_store.put(zlib.decompress(source.read(length)))
+                    continue
+                if pending is not None:
+                    _restore_thread(thread_manager, pending, lazy)
+                    pending = None
+
+                data = _read_payload(source.read(length))
+                if kind == _ASSISTANT:
+                    assistant = _decode_assistant(data, names)
+                    assistant_manager.assistants[assistant.id] = assistant
+                elif kind == _THREAD:
+                    pending = LazyThread(path, data, [], assistant_manager.assistants)
+                elif kind == _RUN and run_manager is not None:
+                    run = Run.model_validate(data)
+                    if run.status in (
+                        RunStatus.QUEUED,
+                        RunStatus.IN_PROGRESS,
+                        RunStatus.CANCELLING,
+                    ):
+                        run.status = RunStatus.FAILED
+                        run.error = "Run was interrupted by a restart"
+                    run_manager.runs[run.id] = run
+            if pending is not None:
+                _restore_thread(thread_manager, pending, lazy)
+    except (OSError, ValueError, zlib.error) as e:
+        raise StorageError(f"Failed to read snapshot {path}: {e}")
+    log("THREAD", f"Snapshot restored from {path}")
+
+
+def _restore_thread(thread_manager: ThreadManager, thread: LazyThread, lazy: bool) -> None:
+    thread_id = thread.header["id"]
+    if lazy:
+        thread_manager.threads.pop(thread_id, None)
+        thread_manager.unloaded_threads[thread_id] = thread
+    else:
+        thread_manager.unloaded_threads.pop(thread_id, None)
+        thread_manager.threads[thread_id] = thread.load()
@@ -1,36 +1,91 @@
 # core/thread_manager.py
+import asyncio
 from ..models.thread import Thread
 from ..models.assistant import Assistant
-from typing import Dict, List, Union, Literal, Optional
+from typing import TYPE_CHECKING, Dict, List, Union, Literal, Optional, Tuple
 from datetime import datetime
 from ..utils.logging_utils import log
 from ..models.message import Message
+from .message_index import MessageIndex
+
+if TYPE_CHECKING:
+    from .snapshot import LazyThread
 
 
 class ThreadManager:
     def __init__(self) -> None:
         self.threads: Dict[str, Thread] = {}
+        # Threads restored from a snapshot whose messages are not decoded yet.
+        self.unloaded_threads: Dict[str, "LazyThread"] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._indexes: Dict[str, MessageIndex] = {}
         log("THREAD", "ThreadManager initialized")
 
-    async def create_thread(self) -> Thread:
-        thread = Thread()
+    async def create_thread(self, thread_id: Optional[str] = None) -> Thread:
+        thread = Thread(id=thread_id) if thread_id else Thread()
         self.threads[thread.id] = thread
         log("THREAD", f"Thread created with id: {thread.id}")
         return thread
 
     async def get_thread(self, thread_id: str) -> Thread:
         thread = self.threads.get(thread_id)
+        if thread is None and thread_id in self.unloaded_threads:
+            thread = self.unloaded_threads.pop(thread_id).load()
+            self.threads[thread_id] = thread
+            log("THREAD", f"Loaded thread {thread_id} from snapshot")
         if thread is None:
             log("ERROR", f"Thread with id {thread_id} not found")
             raise ValueError(f"Thread with id {thread_id} not found")
         log("THREAD", f"Retrieved thread with id: {thread_id}")
         return thread
 
+    def thread_lock(self, thread_id: str) -> asyncio.Lock:
+        """
+        Return the lock that serializes runs on a thread.
+
+        Each thread has its own lock, so runs on different threads never wait
+        for each other.
+
+        Args:
+            thread_id (str): The ID of the thread.
+
+        Returns:
+            asyncio.Lock: The thread's run lock.
+        """
+        lock = self._locks.get(thread_id)
+        if lock is None:
+            lock = self._locks[thread_id] = asyncio.Lock()
+        return lock
+
+    def is_thread_busy(self, thread_id: str) -> bool:
+        lock = self._locks.get(thread_id)
+        return lock is not None and lock.locked()
+
+    async def snapshot_thread(
+        self, thread_id: str
+    ) -> Tuple[List[Assistant], List[Message]]:
+        """
+        Return copies of a thread's assistants and messages.
+
+        A run works on the snapshot, so assistants or messages added to the
+        thread while it executes don't change what the run sees.
+
+        Args:
+            thread_id (str): The ID of the thread.
+
+        Returns:
+            Tuple[List[Assistant], List[Message]]: The assistants and messages.
+        """
+        thread = await self.get_thread(thread_id)
+        return list(thread.assistants), list(thread.messages)
+
     async def add_assistant_to_thread(
         self, thread_id: str, assistant: Assistant
     ) -> None:
         thread = await self.get_thread(thread_id)
-        thread.assistants.append(assistant)
+        # Replace rather than mutate the list so runs iterating over the
+        # previous one are unaffected.
+        thread.assistants = [*thread.assistants, assistant]
         log("THREAD", f"Added assistant {assistant.id} to thread {thread_id}")
 
     async def remove_assistant_from_thread(
@@ -57,10 +112,40 @@ class ThreadManager:
             created_at=datetime.now(),
         )
         thread.messages.append(message)
+        self._index_for(thread).update()
         log("THREAD", f"Added {role} message to thread {thread_id}")
         return message
 
     async def get_messages(self, thread_id: str) -> List[Message]:
         thread = await self.get_thread(thread_id)
         log("THREAD", f"Retrieved messages from thread {thread_id}")
-        return thread.messages
+        return list(thread.messages)
+
+    async def search_messages(
+        self, thread_id: str, query: str, k: int = 5, before: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Find the messages of a thread most relevant to a query.
+
+        Args:
+            thread_id (str): The ID of the thread.
+            query (str): Free text to match.
+            k (int): Maximum number of messages to return.
+            before (Optional[int]): Only search messages at positions below
+                this one.
+
+        Returns:
+            List[Message]: Matching messages, most relevant first.
+        """
+        thread = await self.get_thread(thread_id)
+        hits = self._index_for(thread).search(query, k, before)
+        log("THREAD", f"Found {len(hits)} messages matching query in thread {thread_id}")
+        return [thread.messages[position] for position, _ in hits]
+
+    def _index_for(self, thread: Thread) -> MessageIndex:
+        # Threads restored from a snapshot are indexed on first use, and a
+        # replaced message list gets a fresh index.
+        index = self._indexes.get(thread.id)
+        if index is None or index.messages is not thread.messages:
+            index = self._indexes[thread.id] = MessageIndex(thread.messages)
+        return index
@@ -1,10 +1,43 @@
-from .assistant import Assistant
-from .thread import Thread
-from .run import Run, RunStatus, RequiredAction
-from .tool import Tool, FunctionTool
-from .function import FunctionDefinition, FunctionParameter, FunctionResult, LLMResponse
-from .message import Message
-from .shared import FunctionCall, StepDetails
+from typing import TYPE_CHECKING, Dict, List
+from ..utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .assistant import Assistant
+    from .thread import Thread
+    from .run import Run, RunStatus, RequiredAction
+    from .tool import Tool, FunctionTool
+    from .function import (
+        ExecutionMode,
+        FunctionDefinition,
+        FunctionParameter,
+        FunctionResult,
+        LLMResponse,
+    )
+    from .message import Message
+    from .prompt import StructuredPrompt
+    from .event import RunEvent, RunEventType
+    from .shared import FunctionCall, StepDetails
+
+_LAZY_IMPORTS: Dict[str, str] = {
+    "Assistant": ".assistant",
+    "Thread": ".thread",
+    "Run": ".run",
+    "RunStatus": ".run",
+    "RequiredAction": ".run",
+    "Tool": ".tool",
+    "FunctionTool": ".tool",
+    "ExecutionMode": ".function",
+    "FunctionDefinition": ".function",
+    "FunctionParameter": ".function",
+    "FunctionResult": ".function",
+    "LLMResponse": ".function",
+    "Message": ".message",
+    "StructuredPrompt": ".prompt",
+    "RunEvent": ".event",
+    "RunEventType": ".event",
+    "FunctionCall": ".shared",
+    "StepDetails": ".shared",
+}
 
 __all__ = [
     "Assistant",
@@ -14,11 +47,17 @@ __all__ = [
     "RequiredAction",
     "Tool",
     "FunctionTool",
+    "ExecutionMode",
     "FunctionDefinition",
     "FunctionParameter",
     "FunctionResult",
     "LLMResponse",
     "Message",
+    "StructuredPrompt",
+    "RunEvent",
+    "RunEventType",
     "FunctionCall",
     "StepDetails",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS, __all__)
@@ -0,0 +1,32 @@
+# models/event.py
+from pydantic import BaseModel, Field
+from typing import Any, Dict
+from datetime import datetime, timezone
+from enum import Enum
+from .run import RunStatus
+
+
+class RunEventType(str, Enum):
+    STATUS_CHANGED = "run.status_changed"
+    STEP_STARTED = "run.step.started"
+    STEP_COMPLETED = "run.step.completed"
+    TOOL_RESULT = "run.tool.result"
+    ERROR = "run.error"
+
+
+class RunEvent(BaseModel):
+    type: RunEventType
+    run_id: str
+    thread_id: str
+    status: RunStatus
+    data: Dict[str, Any] = Field(default_factory=dict)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.type == RunEventType.STATUS_CHANGED and self.status in (
+            RunStatus.COMPLETED,
+            RunStatus.FAILED,
+            RunStatus.CANCELLED,
+            RunStatus.EXPIRED,
+        )
@@ -1,13 +1,29 @@
 # models/function.py
-from pydantic import BaseModel, Field
+import inspect
+from pydantic import BaseModel, Field, PrivateAttr, model_validator
 from typing import Dict, Any, List, Optional, Callable
+from enum import Enum
 from .shared import StepDetails, FunctionCall
+from .validation import ArgumentValidator, build_json_schema, compile_validator
+
+
+class ExecutionMode(str, Enum):
+    ASYNC = "async"
+    THREAD = "thread"
+    PROCESS = "process"
 
 
 class FunctionParameter(BaseModel):
     type: str
     description: str
     enum: Optional[List[str]] = None
+    required: Optional[bool] = Field(
+        default=None,
+        description=(
+            "Whether calls must pass the argument. Left unset, it is inferred "
+            "from the implementation: parameters with a default are optional"
+        ),
+    )
 
 
 class FunctionDefinition(BaseModel):
@@ -15,10 +31,91 @@ class FunctionDefinition(BaseModel):
     description: str
     parameters: Dict[str, FunctionParameter]
     implementation: Callable
+    execution_mode: ExecutionMode = Field(
+        default=ExecutionMode.ASYNC,
+        description=(
+            "Where the implementation runs: on the event loop (async), in the "
+            "shared thread pool (thread) or in the shared process pool (process)"
+        ),
+    )
+    timeout: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Maximum number of seconds a single call may take",
+    )
+
+    _validator: Optional[ArgumentValidator] = PrivateAttr(default=None)
+    _json_schema: Optional[Dict[str, Any]] = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
 
+    @model_validator(mode="after")
+    def _infer_required(self) -> "FunctionDefinition":
+        if all(param.required is not None for param in self.parameters.values()):
+            return self
+        try:
+            signature: Optional[inspect.Signature] = inspect.signature(self.implementation)
+        except (TypeError, ValueError):
+            signature = None
+        parameters = {}
+        for name, param in self.parameters.items():
+            if param.required is None:
+                param = param.model_copy(
+                    update={"required": _required_by(signature, name)}
+                )
+            parameters[name] = param
+        self.parameters = parameters
+        return self
+
+    def validate_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Check and coerce call arguments against the declared parameters.
+
+        The validator is compiled on first use and cached on the definition.
+
+        Args:
+            arguments (Dict[str, Any]): Arguments proposed for a call.
+
+        Returns:
+            Dict[str, Any]: The arguments coerced to the declared types.
+
+        Raises:
+            DataValidationError: If any argument is missing, unknown or invalid.
+        """
+        if self._validator is None:
+            self._validator = compile_validator(self.name, self.parameters)
+        return self._validator(arguments)
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        # The compiled validator is a closure and can't be pickled; copies
+        # (e.g. in shard worker processes) compile their own.
+        state = super().__getstate__()
+        state["__pydantic_private__"] = {"_validator": None, "_json_schema": None}
+        return state
+
+    def json_schema(self) -> Dict[str, Any]:
+        """
+        Return the cached JSON Schema of the function's arguments.
+        """
+        if self._json_schema is None:
+            self._json_schema = build_json_schema(self.parameters)
+        return self._json_schema
+
+
+def _required_by(signature: Optional[inspect.Signature], name: str) -> bool:
+    if signature is None:
+        return True
+    parameter = signature.parameters.get(name)
+    if parameter is None:
+        # Accepted through **kwargs, if at all; the implementation copes
+        # without it.
+        return not any(
+            p.kind is inspect.Parameter.VAR_KEYWORD
+            for p in signature.parameters.values()
+        )
+    return parameter.default is inspect.Parameter.empty
+
 
 class FunctionResult(BaseModel):
     name: str
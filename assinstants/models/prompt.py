@@ -0,0 +1,25 @@
+# models/prompt.py
+from typing import Tuple
+
+
+class StructuredPrompt(str):
+    """
+    A prompt string that also exposes its static prefix and dynamic suffix.
+
+    It behaves exactly like the full prompt string, so existing LLM functions
+    keep working. LLM functions that support prompt caching can send `static`
+    and `dynamic` separately (e.g. as system and user messages); `static` only
+    changes when the assistants, their instructions or their tools change.
+    """
+
+    static: str
+    dynamic: str
+
+    def __new__(cls, static: str, dynamic: str) -> "StructuredPrompt":
+        prompt = super().__new__(cls, static + dynamic)
+        prompt.static = static
+        prompt.dynamic = dynamic
+        return prompt
+
+    def __getnewargs__(self) -> Tuple[str, str]:  # type: ignore[override]
+        return (self.static, self.dynamic)
@@ -13,6 +13,9 @@ class RunStatus(str, Enum):
     REQUIRES_ACTION = "requires_action"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLING = "cancelling"
+    CANCELLED = "cancelled"
+    EXPIRED = "expired"
 
 
 class RequiredAction(BaseModel):
@@ -28,6 +31,8 @@ class Run(BaseModel):
     status: RunStatus = RunStatus.QUEUED
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
     steps: List[StepDetails] = Field(default_factory=list)
     error: Optional[str] = None
     token_usage: Dict[str, int] = Field(default_factory=dict)
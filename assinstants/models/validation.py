@@ -0,0 +1,170 @@
+# models/validation.py
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from ..utils.exceptions import DataValidationError
+
+if TYPE_CHECKING:
+    from .function import FunctionParameter
+
+ArgumentValidator = Callable[[Dict[str, Any]], Dict[str, Any]]
+_INVALID = object()
+
+
+def _to_string(value: Any) -> Any:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return _INVALID
+
+
+def _to_integer(value: Any) -> Any:
+    if isinstance(value, bool):
+        return _INVALID
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else _INVALID
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            return _INVALID
+    return _INVALID
+
+
+def _to_number(value: Any) -> Any:
+    if isinstance(value, bool):
+        return _INVALID
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            return _INVALID
+    return _INVALID
+
+
+def _to_boolean(value: Any) -> Any:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in ("true", "1", "yes"):
+            return True
+        if lowered in ("false", "0", "no"):
+            return False
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    return _INVALID
+
+
+def _to_array(value: Any) -> Any:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, tuple):
+        return list(value)
+    return _INVALID
+
+
+def _to_object(value: Any) -> Any:
+    return value if isinstance(value, dict) else _INVALID
+
+
+def _to_null(value: Any) -> Any:
+    return value if value is None else _INVALID
+
+
+def _any(value: Any) -> Any:
+    return value
+
+
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "string": _to_string,
+    "integer": _to_integer,
+    "number": _to_number,
+    "boolean": _to_boolean,
+    "array": _to_array,
+    "object": _to_object,
+    "null": _to_null,
+}
+
+
+def compile_validator(
+    function_name: str, parameters: Dict[str, "FunctionParameter"]
+) -> ArgumentValidator:
+    """
+    Compile function parameters into a validator for call arguments.
+
+    The validator checks that required arguments are present, rejects unknown
+    ones, coerces values to the declared type (e.g. "3" to 3 for an integer)
+    and enforces enums. It returns the coerced arguments.
+
+    Args:
+        function_name (str): Name used in error messages.
+        parameters (Dict[str, FunctionParameter]): The function's parameters.
+
+    Returns:
+        ArgumentValidator: The compiled validator.
+
+    Raises:
+        DataValidationError: From the validator, listing every invalid argument.
+    """
+    specs: List[Tuple[str, Callable[[Any], Any], Optional[frozenset], str]] = [
+        (
+            name,
+            _COERCERS.get(param.type, _any),
+            frozenset(param.enum) if param.enum else None,
+            param.type,
+        )
+        for name, param in parameters.items()
+    ]
+    required = frozenset(name for name, param in parameters.items() if param.required)
+    known = frozenset(parameters)
+
+    def validate(arguments: Dict[str, Any]) -> Dict[str, Any]:
+        errors = []
+        unknown = arguments.keys() - known
+        if unknown:
+            errors.append(f"unexpected arguments: {', '.join(sorted(unknown))}")
+        missing = required - arguments.keys()
+        if missing:
+            errors.append(f"missing arguments: {', '.join(sorted(missing))}")
+
+        coerced: Dict[str, Any] = {}
+        for name, coerce, enum, type_name in specs:
+            if name not in arguments:
+                continue
+            value = coerce(arguments[name])
+            if value is _INVALID:
+                errors.append(f"{name} must be of type {type_name}")
+            elif enum is not None and value not in enum and str(value) not in enum:
+                errors.append(f"{name} must be one of: {', '.join(sorted(enum))}")
+            else:
+                coerced[name] = value
+
+        if errors:
+            raise DataValidationError(
+                f"Invalid arguments for function {function_name}: {'; '.join(errors)}"
+            )
+        return coerced
+
+    return validate
+
+
+def build_json_schema(parameters: Dict[str, "FunctionParameter"]) -> Dict[str, Any]:
+    """
+    Build the JSON Schema describing a function's arguments.
+    """
+    properties: Dict[str, Any] = {}
+    for name, param in parameters.items():
+        schema: Dict[str, Any] = {"type": param.type, "description": param.description}
+        if param.enum:
+            schema["enum"] = list(param.enum)
+        properties[name] = schema
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": [name for name, param in parameters.items() if param.required],
+        "additionalProperties": False,
+    }
@@ -0,0 +1,15 @@
+from typing import TYPE_CHECKING, Dict, List
+from ..utils.lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .openai_compatible import OpenAICompatibleProvider
+    from .routing import RoutingLLMFunction
+
+_LAZY_IMPORTS: Dict[str, str] = {
+    "OpenAICompatibleProvider": ".openai_compatible",
+    "RoutingLLMFunction": ".routing",
+}
+
+__all__: List[str] = ["OpenAICompatibleProvider", "RoutingLLMFunction"]
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS, __all__)
@@ -0,0 +1,267 @@
+# providers/openai_compatible.py
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+import aiohttp
+from ..models.prompt import StructuredPrompt
+from ..utils.exceptions import (
+    AuthenticationError,
+    ConfigurationError,
+    ProviderAPIError,
+    RateLimitError,
+)
+from ..utils.logging_utils import log
+
+
+class OpenAICompatibleProvider:
+    """
+    LLM function for OpenAI-compatible chat completion APIs.
+
+    An instance owns one connection pool with keep-alive that is reused by
+    every call, so share a single instance between assistants instead of
+    creating one per request. Pass it as an assistant's custom_llm_function;
+    the assistant's provider_config is sent as extra request parameters
+    (e.g. temperature, max_tokens).
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://api.openai.com/v1",
+        api_key: Optional[str] = None,
+        max_connections: int = 100,
+        max_connections_per_host: int = 0,
+        keepalive_timeout: float = 30.0,
+        timeout: float = 60.0,
+        http2: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Initialize the OpenAICompatibleProvider.
+
+        Args:
+            base_url (str): Base URL of the API, up to and including the version.
+            api_key (Optional[str]): Bearer token sent with every request.
+            max_connections (int): Size of the connection pool.
+            max_connections_per_host (int): Per-host pool limit, 0 for no limit.
+            keepalive_timeout (float): Seconds an idle connection is kept open.
+            timeout (float): Total seconds allowed per request.
+            http2 (bool): Use HTTP/2. Requires httpx with the http2 extra.
+            headers (Optional[Dict[str, str]]): Extra headers for every request.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.http2 = http2
+        self.headers: Dict[str, str] = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.headers.update(headers or {})
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._http2_client: Any = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._transport_errors: Tuple[Type[BaseException], ...] = (
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+            json.JSONDecodeError,
+        )
+
+        if http2:
+            try:
+                import h2  # noqa: F401
+                import httpx
+            except ImportError:
+                raise ConfigurationError(
+                    "HTTP/2 support needs httpx with the http2 extra: "
+                    "pip install 'httpx[http2]'"
+                )
+            self._transport_errors += (httpx.HTTPError,)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Connection pools belong to one event loop and cannot be pickled;
+        # copies (e.g. in shard worker processes) open their own.
+        state = self.__dict__.copy()
+        state.update(_session=None, _http2_client=None, _loop=None)
+        return state
+
+    async def __call__(self, model: str, prompt: str, **kwargs: Any) -> str:
+        """
+        Request a chat completion and return its text.
+
+        Args:
+            model (str): The model name.
+            prompt (str): The prompt, sent as a single user message, or as a
+                system and a user message if it is a StructuredPrompt.
+            **kwargs: Extra request parameters. With stream=True the response
+                is streamed and joined.
+
+        Returns:
+            str: The content of the first choice.
+        """
+        if kwargs.pop("stream", False):
+            return "".join([chunk async for chunk in self.stream(model, prompt, **kwargs)])
+
+        data = await self._post_json(self._build_body(model, prompt, kwargs))
+        try:
+            return data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            raise ProviderAPIError(f"Unexpected response from {self.base_url}: {data}")
+
+    async def stream(self, model: str, prompt: str, **kwargs: Any) -> AsyncIterator[str]:
+        """
+        Request a chat completion and yield its text as it arrives.
+
+        Args:
+            model (str): The model name.
+            prompt (str): The prompt, sent as in __call__.
+            **kwargs: Extra request parameters.
+
+        Yields:
+            str: Content deltas of the first choice.
+        """
+        body = self._build_body(model, prompt, kwargs)
+        body["stream"] = True
+        async for line in self._post_stream(body):
+            if not line.startswith("data:"):
+                continue
+            payload = line[len("data:"):].strip()
+            if payload == "[DONE]":
+                return
+            try:
+                choices = json.loads(payload).get("choices") or [{}]
+            except json.JSONDecodeError:
+                continue
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+    async def aclose(self) -> None:
+        """
+        Close the connection pool.
+        """
+        session, client = self._session, self._http2_client
+        self._session = None
+        self._http2_client = None
+        await self._close_pools(session, client)
+
+    @staticmethod
+    async def _close_pools(
+        session: Optional[aiohttp.ClientSession], client: Any
+    ) -> None:
+        if session is not None:
+            await session.close()
+        if client is not None:
+            await client.aclose()
+
+    def _build_body(
+        self, model: str, prompt: str, params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        messages: List[Dict[str, str]] = [{"role": "user", "content": prompt}]
+        if isinstance(prompt, StructuredPrompt):
+            # A stable system message lets the provider cache the prefix.
+            messages = [
+                {"role": "system", "content": prompt.static},
+                {"role": "user", "content": prompt.dynamic},
+            ]
+        return {"model": model, "messages": messages, **params}
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Pools cannot be shared across event loops, and an open one can only
+        # be closed on the loop that opened it.
+        session, client = self._session, self._http2_client
+        if session is not None and session.closed:
+            session = None
+        if self._loop is not None and (session is not None or client is not None):
+            if not self._loop.is_running():
+                raise ConfigurationError(
+                    f"The connection pool for {self.base_url} was opened on an event "
+                    "loop that is no longer running; await aclose() before that loop "
+                    "ends to use the provider on another one"
+                )
+            asyncio.run_coroutine_threadsafe(
+                self._close_pools(session, client), self._loop
+            )
+        self._session = None
+        self._http2_client = None
+        self._loop = loop
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        self._check_loop()
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            log("ASSISTANT", f"Opened connection pool for {self.base_url}")
+        return self._session
+
+    def _get_http2_client(self) -> Any:
+        self._check_loop()
+        if self._http2_client is None:
+            import httpx
+
+            self._http2_client = httpx.AsyncClient(
+                http2=True,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_timeout,
+                ),
+            )
+            log("ASSISTANT", f"Opened HTTP/2 connection pool for {self.base_url}")
+        return self._http2_client
+
+    def _raise_for_status(self, status: int, text: str) -> None:
+        if status < 400:
+            return
+        message = f"{self.base_url} returned HTTP {status}: {text[:500]}"
+        if status in (401, 403):
+            raise AuthenticationError(message)
+        if status == 429:
+            raise RateLimitError(message)
+        raise ProviderAPIError(message)
+
+    async def _post_json(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        url = f"{self.base_url}/chat/completions"
+        try:
+            if self.http2:
+                response = await self._get_http2_client().post(url, json=body)
+                self._raise_for_status(response.status_code, response.text)
+                return response.json()
+            async with self._get_session().post(url, json=body) as resp:
+                text = await resp.text()
+                self._raise_for_status(resp.status, text)
+                return json.loads(text)
+        except self._transport_errors as e:
+            raise ProviderAPIError(f"Request to {url} failed: {e}")
+
+    async def _post_stream(self, body: Dict[str, Any]) -> AsyncIterator[str]:
+        url = f"{self.base_url}/chat/completions"
+        try:
+            if self.http2:
+                client = self._get_http2_client()
+                async with client.stream("POST", url, json=body) as response:
+                    if response.status_code >= 400:
+                        text = (await response.aread()).decode("utf-8", "replace")
+                        self._raise_for_status(response.status_code, text)
+                    async for line in response.aiter_lines():
+                        yield line
+                return
+            async with self._get_session().post(url, json=body) as resp:
+                if resp.status >= 400:
+                    self._raise_for_status(resp.status, await resp.text())
+                async for raw_line in resp.content:
+                    yield raw_line.decode("utf-8").rstrip("\r\n")
+        except self._transport_errors as e:
+            raise ProviderAPIError(f"Request to {url} failed: {e}")
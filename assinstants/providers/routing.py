@@ -0,0 +1,259 @@
+# providers/routing.py
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Union
+from ..utils.exceptions import ProviderAPIError
+from ..utils.logging_utils import log
+
+
+class BackendStats:
+    """
+    Latency and error statistics for one routed backend.
+    """
+
+    def __init__(self, name: str, function: Callable, window: int) -> None:
+        self.name = name
+        self.function = function
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.selected = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.in_flight = 0
+        self.last_error_at: Optional[float] = None
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, math.ceil(quantile * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "selected": self.selected,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "in_flight": self.in_flight,
+            "ewma_latency": self.ewma_latency,
+            "error_rate": self.error_rate,
+            "p50_latency": self.percentile(0.5),
+            "p95_latency": self.percentile(0.95),
+        }
+
+
+class RoutingLLMFunction:
+    """
+    LLM function that spreads calls over several backends.
+
+    Every call goes to the healthy backend with the lowest EWMA latency.
+    Backends whose EWMA error rate exceeds error_threshold are skipped until
+    cooldown seconds pass without a new error. With hedging enabled, a
+    duplicate request is sent to the next-best backend when the first one has
+    not answered within its p95 latency; the first answer wins and the other
+    request is cancelled.
+    """
+
+    def __init__(
+        self,
+        backends: Union[List[Callable], Dict[str, Callable]],
+        alpha: float = 0.2,
+        error_threshold: float = 0.5,
+        cooldown: float = 30.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        min_hedge_delay: float = 0.05,
+        min_samples: int = 20,
+        window: int = 200,
+        failover: bool = True,
+    ) -> None:
+        """
+        Initialize the RoutingLLMFunction.
+
+        Args:
+            backends (Union[List[Callable], Dict[str, Callable]]): LLM functions
+                to route between, optionally keyed by a name used in metrics.
+            alpha (float): Smoothing factor for the latency and error EWMAs.
+            error_threshold (float): Error rate above which a backend is unhealthy.
+            cooldown (float): Seconds after its last error before an unhealthy
+                backend is tried again.
+            hedge (bool): Whether to send hedged duplicate requests.
+            hedge_quantile (float): Latency quantile of the primary backend after
+                which the hedge is sent.
+            min_hedge_delay (float): Lower bound for the hedge delay in seconds.
+            min_samples (int): Latency samples needed before hedging a backend.
+            window (int): Number of recent latencies kept per backend.
+            failover (bool): Whether to retry a failed call on another backend.
+        """
+        if not backends:
+            raise ValueError("RoutingLLMFunction needs at least one backend")
+        if not isinstance(backends, dict):
+            named: Dict[str, Callable] = {}
+            for index, function in enumerate(backends):
+                name = getattr(function, "__name__", type(function).__name__)
+                named[f"{name}-{index}" if name in named else name] = function
+            backends = named
+        self.backends: Dict[str, BackendStats] = {
+            name: BackendStats(name, function, window)
+            for name, function in backends.items()
+        }
+        self.alpha = alpha
+        self.error_threshold = error_threshold
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.failover = failover
+        self.requests = 0
+        self.hedged_requests = 0
+        self.failovers = 0
+
+    async def __call__(self, model: str, prompt: str, **kwargs: Any) -> str:
+        self.requests += 1
+        ranked = self._rank()
+        primary = ranked[0]
+        primary.selected += 1
+        tried = [primary]
+        try:
+            if self.hedge and len(ranked) > 1 and self._hedge_delay(primary) is not None:
+                return await self._hedged_call(
+                    primary, ranked[1], model, prompt, kwargs, tried
+                )
+            return await self._call(primary, model, prompt, kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            fallback = [b for b in ranked if b not in tried and self._is_healthy(b)]
+            if not self.failover or not fallback:
+                raise
+            self.failovers += 1
+            log(
+                "ERROR",
+                f"LLM backend {primary.name} failed ({e}); failing over to {fallback[0].name}",
+                logging.ERROR,
+            )
+            fallback[0].selected += 1
+            return await self._call(fallback[0], model, prompt, kwargs)
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Return routing metrics.
+
+        Returns:
+            Dict[str, Any]: Totals plus per-backend call counts, selections,
+            hedges, error rates and latency statistics.
+        """
+        return {
+            "requests": self.requests,
+            "hedged_requests": self.hedged_requests,
+            "failovers": self.failovers,
+            "backends": {name: b.as_dict() for name, b in self.backends.items()},
+        }
+
+    def _is_healthy(self, backend: BackendStats) -> bool:
+        if backend.error_rate <= self.error_threshold:
+            return True
+        return (
+            backend.last_error_at is None
+            or time.monotonic() - backend.last_error_at >= self.cooldown
+        )
+
+    def _rank(self) -> List[BackendStats]:
+        # Backends without samples rank first so every backend gets measured.
+        return sorted(
+            self.backends.values(),
+            key=lambda b: (
+                not self._is_healthy(b),
+                b.ewma_latency if b.ewma_latency is not None else -1.0,
+                b.in_flight,
+            ),
+        )
+
+    def _hedge_delay(self, backend: BackendStats) -> Optional[float]:
+        if len(backend.latencies) < self.min_samples:
+            return None
+        delay = backend.percentile(self.hedge_quantile)
+        return max(self.min_hedge_delay, delay or 0.0)
+
+    def _record(self, backend: BackendStats, latency: Optional[float]) -> None:
+        failed = latency is None
+        backend.error_rate += self.alpha * (float(failed) - backend.error_rate)
+        if failed:
+            backend.errors += 1
+            backend.last_error_at = time.monotonic()
+            return
+        assert latency is not None
+        backend.latencies.append(latency)
+        if backend.ewma_latency is None:
+            backend.ewma_latency = latency
+        else:
+            backend.ewma_latency += self.alpha * (latency - backend.ewma_latency)
+
+    async def _call(
+        self, backend: BackendStats, model: str, prompt: str, kwargs: Dict[str, Any]
+    ) -> str:
+        backend.calls += 1
+        backend.in_flight += 1
+        started = time.monotonic()
+        try:
+            result = await backend.function(model, prompt, **kwargs)
+        except asyncio.CancelledError:
+            # A cancelled request says nothing about the backend's health.
+            raise
+        except Exception:
+            self._record(backend, None)
+            raise
+        finally:
+            backend.in_flight -= 1
+        self._record(backend, time.monotonic() - started)
+        return result
+
+    async def _hedged_call(
+        self,
+        primary: BackendStats,
+        secondary: BackendStats,
+        model: str,
+        prompt: str,
+        kwargs: Dict[str, Any],
+        tried: List[BackendStats],
+    ) -> str:
+        # The secondary only counts as tried once the hedge is sent; if the
+        # primary fails before the hedge delay, it stays available for failover.
+        first = asyncio.ensure_future(self._call(primary, model, prompt, kwargs))
+        tasks: Set["asyncio.Future[str]"] = {first}
+        owners: Dict["asyncio.Future[str]", BackendStats] = {first: primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+            if not done:
+                self.hedged_requests += 1
+                secondary.hedges += 1
+                tried.append(secondary)
+                second = asyncio.ensure_future(self._call(secondary, model, prompt, kwargs))
+                tasks.add(second)
+                owners[second] = secondary
+
+            errors: List[BaseException] = []
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if owners[task] is secondary:
+                            secondary.hedge_wins += 1
+                        return task.result()
+                    errors.append(error)
+            raise ProviderAPIError(
+                "All hedged requests failed: " + "; ".join(str(e) for e in errors)
+            )
+        finally:
+            for task in tasks:
+                task.cancel()
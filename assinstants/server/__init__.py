@@ -0,0 +1,5 @@
+from .app import AssistantServer, create_app
+from .fake_llm import make_fake_llm_function
+from typing import List
+
+__all__: List[str] = ["AssistantServer", "create_app", "make_fake_llm_function"]
@@ -0,0 +1,371 @@
+# server/app.py
+import asyncio
+import json
+import re
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..core.assistant_manager import AssistantManager
+from ..core.run_manager import RunManager
+from ..core.thread_manager import ThreadManager
+from ..models.event import RunEvent
+from ..models.thread import Thread
+from ..utils.exceptions import BaseAIFrameworkError, ConcurrencyError
+from ..utils.logging_utils import log
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[List] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or []
+
+
+class AssistantServer:
+    """
+    ASGI application exposing threads, messages and runs over HTTP.
+
+    Runs can be streamed as Server-Sent Events. At most max_concurrent_runs
+    runs execute at once; up to max_pending_runs more wait for a slot, and
+    further run requests are rejected with 429 so load sheds instead of
+    queueing without bound.
+    """
+
+    def __init__(
+        self,
+        assistant_manager: AssistantManager,
+        thread_manager: ThreadManager,
+        run_manager: RunManager,
+        max_concurrent_runs: int = 64,
+        max_pending_runs: int = 256,
+        max_body_size: int = 1024 * 1024,
+        heartbeat_interval: float = 15.0,
+    ) -> None:
+        """
+        Initialize the AssistantServer.
+
+        Args:
+            assistant_manager (AssistantManager): Source of assistants.
+            thread_manager (ThreadManager): Storage for threads and messages.
+            run_manager (RunManager): Executes runs.
+            max_concurrent_runs (int): Runs allowed to execute at once.
+            max_pending_runs (int): Runs allowed to wait for a free slot.
+            max_body_size (int): Largest accepted request body in bytes.
+            heartbeat_interval (float): Seconds between SSE keep-alive comments.
+        """
+        self.assistant_manager = assistant_manager
+        self.thread_manager = thread_manager
+        self.run_manager = run_manager
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_pending_runs = max_pending_runs
+        self.max_body_size = max_body_size
+        self.heartbeat_interval = heartbeat_interval
+        self._run_slots: Optional[asyncio.Semaphore] = None
+        self._pending_runs = 0
+        self._routes: List[Tuple[str, "re.Pattern[str]", Callable[..., Awaitable]]] = [
+            ("GET", re.compile(r"^/health$"), self._health),
+            ("GET", re.compile(r"^/assistants$"), self._list_assistants),
+            ("POST", re.compile(r"^/threads$"), self._create_thread),
+            ("GET", re.compile(r"^/threads/(?P<thread_id>[^/]+)$"), self._get_thread),
+            (
+                "POST",
+                re.compile(r"^/threads/(?P<thread_id>[^/]+)/messages$"),
+                self._add_message,
+            ),
+            (
+                "GET",
+                re.compile(r"^/threads/(?P<thread_id>[^/]+)/messages$"),
+                self._list_messages,
+            ),
+            (
+                "POST",
+                re.compile(r"^/threads/(?P<thread_id>[^/]+)/runs$"),
+                self._create_run,
+            ),
+            ("GET", re.compile(r"^/runs/(?P<run_id>[^/]+)$"), self._get_run),
+            (
+                "POST",
+                re.compile(r"^/runs/(?P<run_id>[^/]+)/cancel$"),
+                self._cancel_run,
+            ),
+        ]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        try:
+            handler, params = self._match(scope["method"], scope["path"])
+            await handler(scope, receive, send, **params)
+        except HTTPError as e:
+            await self._send_json(send, e.status, {"error": e.message}, e.headers)
+        except ValueError as e:
+            status = 404 if "not found" in str(e) else 400
+            await self._send_json(send, status, {"error": str(e)})
+        except ConcurrencyError as e:
+            await self._send_json(send, 409, {"error": str(e)})
+        except BaseAIFrameworkError as e:
+            await self._send_json(send, 500, {"error": str(e)})
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.run_manager.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _match(
+        self, method: str, path: str
+    ) -> Tuple[Callable[..., Awaitable], Dict[str, str]]:
+        path_matched = False
+        for route_method, pattern, handler in self._routes:
+            match = pattern.match(path)
+            if match is None:
+                continue
+            path_matched = True
+            if route_method == method:
+                return handler, match.groupdict()
+        if path_matched:
+            raise HTTPError(405, "Method not allowed")
+        raise HTTPError(404, "Not found")
+
+    async def _read_json(self, receive: Receive) -> Dict[str, Any]:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if len(body) > self.max_body_size:
+                raise HTTPError(413, "Request body too large")
+            if not message.get("more_body", False):
+                break
+        if not body:
+            return {}
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+
+    async def _send_json(
+        self, send: Send, status: int, data: Any, headers: Optional[List] = None
+    ) -> None:
+        body = json.dumps(data, default=str, separators=(",", ":")).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    *(headers or []),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def _serialize_thread(self, thread: Thread) -> Dict[str, Any]:
+        return {
+            "id": thread.id,
+            "assistant_ids": [assistant.id for assistant in thread.assistants],
+            "message_count": len(thread.messages),
+        }
+
+    async def _acquire_run_slot(self) -> asyncio.Semaphore:
+        if self._run_slots is None:
+            self._run_slots = asyncio.Semaphore(self.max_concurrent_runs)
+        if self._run_slots.locked() and self._pending_runs >= self.max_pending_runs:
+            raise HTTPError(429, "Too many runs in progress", [(b"retry-after", b"1")])
+        self._pending_runs += 1
+        try:
+            await self._run_slots.acquire()
+        finally:
+            self._pending_runs -= 1
+        return self._run_slots
+
+    async def _health(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self._send_json(send, 200, {"status": "ok"})
+
+    async def _list_assistants(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assistants = [
+            {"id": a.id, "name": a.name, "model": a.model}
+            for a in self.assistant_manager.assistants.values()
+        ]
+        await self._send_json(send, 200, {"data": assistants})
+
+    async def _create_thread(self, scope: Scope, receive: Receive, send: Send) -> None:
+        data = await self._read_json(receive)
+        assistant_ids = data.get("assistant_ids")
+        if assistant_ids is None:
+            assistant_ids = list(self.assistant_manager.assistants)
+        assistants = [
+            await self.assistant_manager.get_assistant(assistant_id)
+            for assistant_id in assistant_ids
+        ]
+        thread = await self.thread_manager.create_thread()
+        for assistant in assistants:
+            await self.thread_manager.add_assistant_to_thread(thread.id, assistant)
+        await self._send_json(send, 201, self._serialize_thread(thread))
+
+    async def _get_thread(
+        self, scope: Scope, receive: Receive, send: Send, thread_id: str
+    ) -> None:
+        thread = await self.thread_manager.get_thread(thread_id)
+        await self._send_json(send, 200, self._serialize_thread(thread))
+
+    async def _add_message(
+        self, scope: Scope, receive: Receive, send: Send, thread_id: str
+    ) -> None:
+        data = await self._read_json(receive)
+        role = data.get("role", "user")
+        content = data.get("content")
+        if role not in ("user", "assistant") or not isinstance(content, str):
+            raise HTTPError(400, "A message needs a role and string content")
+        message = await self.thread_manager.add_message(
+            thread_id, role, content, data.get("assistant_id")
+        )
+        await self._send_json(send, 201, message.model_dump(mode="json"))
+
+    async def _list_messages(
+        self, scope: Scope, receive: Receive, send: Send, thread_id: str
+    ) -> None:
+        messages = await self.thread_manager.get_messages(thread_id)
+        await self._send_json(
+            send, 200, {"data": [m.model_dump(mode="json") for m in messages]}
+        )
+
+    async def _create_run(
+        self, scope: Scope, receive: Receive, send: Send, thread_id: str
+    ) -> None:
+        data = await self._read_json(receive)
+        thread = await self.thread_manager.get_thread(thread_id)
+        if not thread.assistants:
+            raise HTTPError(400, f"Thread {thread_id} has no assistants")
+
+        slots = await self._acquire_run_slot()
+        try:
+            if data.get("stream"):
+                await self._stream_run(receive, send, thread_id)
+            else:
+                run = await self.run_manager.create_and_execute_run(thread_id)
+                await self._send_json(send, 200, run.model_dump(mode="json"))
+        finally:
+            slots.release()
+
+    async def _stream_run(self, receive: Receive, send: Send, thread_id: str) -> None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+
+        async def emit(event: str, data: Any) -> None:
+            payload = json.dumps(data, default=str, separators=(",", ":"))
+            chunk = f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+        async def watch_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        # Subscribe before the run starts so that no event is missed.
+        run_id = str(uuid.uuid4())
+        subscription = self.run_manager.subscribe(run_id=run_id)
+        run_task = asyncio.ensure_future(
+            self.run_manager.create_and_execute_run(thread_id, run_id=run_id)
+        )
+        disconnect_task = asyncio.ensure_future(watch_disconnect())
+        next_event: Optional["asyncio.Future[Optional[RunEvent]]"] = None
+        try:
+            while True:
+                if next_event is None:
+                    next_event = asyncio.ensure_future(subscription.get())
+                waiters: Set["asyncio.Future[Any]"] = {next_event, disconnect_task}
+                if not run_task.done():
+                    waiters.add(run_task)
+                done, _ = await asyncio.wait(
+                    waiters,
+                    timeout=self.heartbeat_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnect_task in done:
+                    # Nobody is listening any more; free the run slot.
+                    run_task.cancel()
+                    log("THREAD", f"Client disconnected from run {run_id}")
+                    return
+                if run_task in done:
+                    # Buffered events are still delivered after closing.
+                    subscription.close()
+                if next_event in done:
+                    event = next_event.result()
+                    next_event = None
+                    if event is None:
+                        break
+                    await emit(event.type.value, event.model_dump(mode="json"))
+                elif not done:
+                    await send(
+                        {"type": "http.response.body", "body": b": ping\n\n", "more_body": True}
+                    )
+            try:
+                await run_task
+            except Exception as e:
+                await emit("error", {"error": str(e)})
+            await emit("done", {})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            subscription.close()
+            disconnect_task.cancel()
+            if next_event is not None:
+                next_event.cancel()
+
+    async def _get_run(
+        self, scope: Scope, receive: Receive, send: Send, run_id: str
+    ) -> None:
+        run = await self.run_manager.get_run(run_id)
+        await self._send_json(send, 200, run.model_dump(mode="json"))
+
+    async def _cancel_run(
+        self, scope: Scope, receive: Receive, send: Send, run_id: str
+    ) -> None:
+        run = await self.run_manager.cancel_run(run_id)
+        await self._send_json(send, 200, run.model_dump(mode="json"))
+
+
+def create_app(
+    assistant_manager: AssistantManager,
+    thread_manager: ThreadManager,
+    run_manager: Optional[RunManager] = None,
+    **kwargs: Any,
+) -> AssistantServer:
+    """
+    Create the ASGI application for the given managers.
+
+    Args:
+        assistant_manager (AssistantManager): Source of assistants.
+        thread_manager (ThreadManager): Storage for threads and messages.
+        run_manager (Optional[RunManager]): Executes runs. Created if omitted.
+        **kwargs: Options passed to AssistantServer.
+
+    Returns:
+        AssistantServer: The ASGI application.
+    """
+    if run_manager is None:
+        run_manager = RunManager(assistant_manager, thread_manager)
+    return AssistantServer(assistant_manager, thread_manager, run_manager, **kwargs)
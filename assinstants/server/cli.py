@@ -0,0 +1,102 @@
+# server/cli.py
+import argparse
+import asyncio
+import importlib
+from typing import Any, List, Optional
+from ..core.assistant_manager import AssistantManager
+from ..core.run_manager import RunManager
+from ..core.thread_manager import ThreadManager
+from ..utils.logging_utils import set_logging
+from .app import AssistantServer, create_app
+from .fake_llm import make_fake_llm_function
+
+
+def _load_factory(path: str) -> Any:
+    module_name, _, attribute = path.partition(":")
+    if not attribute:
+        raise SystemExit(f"--app must look like 'module:factory', got {path!r}")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def build_fake_app(latency: float = 0.0, **kwargs: Any) -> AssistantServer:
+    """
+    Build a server with a single echo assistant backed by a fake LLM function.
+    """
+    assistant_manager = AssistantManager()
+    thread_manager = ThreadManager()
+    asyncio.run(
+        assistant_manager.create_assistant(
+            name="Echo Assistant",
+            instructions="Repeat the user's message.",
+            model="fake",
+            custom_llm_function=make_fake_llm_function(latency),
+        )
+    )
+    run_manager = RunManager(assistant_manager, thread_manager)
+    return create_app(assistant_manager, thread_manager, run_manager, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="assinstants-server", description="Serve assistants over HTTP."
+    )
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--app",
+        help="'module:factory' returning an ASGI app such as AssistantServer",
+    )
+    source.add_argument(
+        "--fake-llm",
+        action="store_true",
+        help="Serve an echo assistant backed by a fake LLM function",
+    )
+    parser.add_argument("--fake-latency", type=float, default=0.0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--max-concurrent-runs",
+        type=int,
+        help="Runs allowed to execute at once (default: 64, or the app's own limit)",
+    )
+    parser.add_argument(
+        "--max-pending-runs",
+        type=int,
+        help="Runs allowed to wait for a slot (default: 256, or the app's own limit)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Disable run logging")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit(
+            "assinstants-server needs uvicorn: pip install 'assinstants[server]'"
+        )
+
+    # Limits given on the command line override those of the app.
+    limits = {
+        name: value
+        for name, value in (
+            ("max_concurrent_runs", args.max_concurrent_runs),
+            ("max_pending_runs", args.max_pending_runs),
+        )
+        if value is not None
+    }
+    if args.fake_llm:
+        app = build_fake_app(args.fake_latency, **limits)
+    else:
+        app = _load_factory(args.app)()
+        if limits:
+            if not isinstance(app, AssistantServer):
+                parser.error(
+                    "--max-concurrent-runs and --max-pending-runs need --app to "
+                    "return an AssistantServer"
+                )
+            for name, value in limits.items():
+                setattr(app, name, value)
+    # uvicorn configures logging when the config is built, which would
+    # re-enable a logger disabled any earlier.
+    config = uvicorn.Config(app, host=args.host, port=args.port)
+    if args.quiet:
+        set_logging(False)
+    uvicorn.Server(config).run()
@@ -0,0 +1,33 @@
+# server/fake_llm.py
+import asyncio
+import json
+import re
+from typing import Any, Callable, Awaitable
+
+_USER_QUERY = re.compile(r"<user_query>\s*(.*?)\s*</user_query>", re.DOTALL)
+
+
+def make_fake_llm_function(latency: float = 0.0) -> Callable[..., Awaitable[str]]:
+    """
+    Create an LLM function that answers without calling a model.
+
+    The planning prompt gets an empty plan and the final prompt gets an echo of
+    the user query, which makes the server runnable and load-testable locally.
+
+    Args:
+        latency (float): Seconds to sleep per call, to mimic a real provider.
+
+    Returns:
+        Callable[..., Awaitable[str]]: The fake LLM function.
+    """
+
+    async def fake_llm_function(model: str, prompt: str, **kwargs: Any) -> str:
+        if latency:
+            await asyncio.sleep(latency)
+        if "selected_assistant_index" in prompt:
+            return json.dumps({"steps": [], "selected_assistant_index": 0})
+        match = _USER_QUERY.search(prompt)
+        query = match.group(1) if match else ""
+        return json.dumps({"response": f"Echo: {query}", "function_calls": []})
+
+    return fake_llm_function
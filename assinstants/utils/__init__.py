@@ -1,4 +1,14 @@
-from .logging_utils import set_logging, log
-from typing import List
+from typing import TYPE_CHECKING, Dict, List
+from .lazy import lazy_exports
+
+if TYPE_CHECKING:
+    from .logging_utils import set_logging, log
+
+_LAZY_IMPORTS: Dict[str, str] = {
+    "set_logging": ".logging_utils",
+    "log": ".logging_utils",
+}
 
 __all__: List[str] = ["set_logging", "log"]
+
+__getattr__, __dir__ = lazy_exports(__name__, globals(), _LAZY_IMPORTS, __all__)
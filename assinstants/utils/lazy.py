@@ -0,0 +1,40 @@
+# utils/lazy.py
+import importlib
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_exports(
+    package: str,
+    namespace: Dict[str, Any],
+    imports: Dict[str, str],
+    names: List[str],
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Build a package's __getattr__ and __dir__ so that its public names are
+    imported on first access.
+
+    Args:
+        package (str): The package's __name__.
+        namespace (Dict[str, Any]): The package's globals(); imported names
+            are cached there so each one is only resolved once.
+        imports (Dict[str, str]): Maps each public name to the module,
+            relative to the package, that defines it.
+        names (List[str]): The package's __all__.
+
+    Returns:
+        Tuple[Callable[[str], Any], Callable[[], List[str]]]: The module
+        __getattr__ and __dir__ functions.
+    """
+
+    def __getattr__(name: str) -> Any:
+        module_name = imports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(names))
+
+    return __getattr__, __dir__
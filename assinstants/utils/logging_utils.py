@@ -1,24 +1,23 @@
 import logging
-from colorama import Fore, Style, init
-
-init(autoreset=True)
 
 
 class ColoredFormatter(logging.Formatter):
     COLORS = {
-        "THREAD": Fore.CYAN,
-        "ASSISTANT": Fore.MAGENTA,
-        "STEP": Fore.YELLOW,
-        "FUNCTION": Fore.GREEN,
-        "ERROR": Fore.RED,
+        "THREAD": "CYAN",
+        "ASSISTANT": "MAGENTA",
+        "STEP": "YELLOW",
+        "FUNCTION": "GREEN",
+        "ERROR": "RED",
     }
 
     def format(self, record):
         if not record.msg.startswith(tuple(self.COLORS.keys())):
             return logging.Formatter.format(self, record)
 
+        from colorama import Fore, Style
+
         category, message = record.msg.split(":", 1)
-        color = self.COLORS.get(category, "")
+        color = getattr(Fore, self.COLORS.get(category, ""), "")
         record.msg = f"{color}{category}:{Style.RESET_ALL}{message}"
         return logging.Formatter.format(self, record)
 
@@ -26,9 +25,22 @@ class ColoredFormatter(logging.Formatter):
 logger = logging.getLogger("assinstants")
 logger.setLevel(logging.INFO)
 
-handler = logging.StreamHandler()
-handler.setFormatter(ColoredFormatter("%(message)s"))
-logger.addHandler(handler)
+_configured = False
+
+
+def _configure() -> None:
+    # Deferred until the first log call so that importing the package does
+    # not touch stdout/stderr or pull in colorama.
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    from colorama import init
+
+    init(autoreset=True)
+    handler = logging.StreamHandler()
+    handler.setFormatter(ColoredFormatter("%(message)s"))
+    logger.addHandler(handler)
 
 
 def set_logging(enabled: bool):
@@ -36,4 +48,6 @@ def set_logging(enabled: bool):
 
 
 def log(category: str, message: str, level: int = logging.INFO):
+    if not _configured:
+        _configure()
     logger.log(level, f"{category}: {message}")
@@ -0,0 +1,64 @@
+"""
+Check that `import assinstants` stays within its cold-start budget.
+
+Each sample imports the package in a fresh interpreter and the interpreter's
+own startup time is subtracted. The check also fails if the import pulls in
+heavy modules that should only load on first use.
+
+Usage:
+    python benchmarks/import_time.py [--budget-ms 30] [--runs 15]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+HEAVY_MODULES = ["pydantic", "aiohttp", "colorama", "asyncio", "multiprocessing"]
+
+
+def _median_runtime(code: str, runs: int) -> float:
+    samples: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], check=True)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    parser.add_argument("--runs", type=int, default=15)
+    args = parser.parse_args()
+
+    loaded = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, assinstants; print(' '.join(sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+    eager = [m for m in HEAVY_MODULES if m in loaded]
+
+    baseline = _median_runtime("pass", args.runs)
+    with_package = _median_runtime("import assinstants", args.runs)
+    cost_ms = max(0.0, (with_package - baseline) * 1000)
+
+    print(f"import assinstants: {cost_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        return 1
+    if cost_ms > args.budget_ms:
+        print("FAIL: import time is over budget")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
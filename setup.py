@@ -34,4 +34,13 @@ setup(
         "colorama",
         "setuptools_scm",
     ],
+    extras_require={
+        "server": ["uvicorn"],
+        "http2": ["httpx[http2]"],
+    },
+    entry_points={
+        "console_scripts": [
+            "assinstants-server=assinstants.server.cli:main",
+        ],
+    },
 )